@@ -9,13 +9,21 @@ Date: November 9, 2025
 Data Source: OECD Statistical Database (SDMX-JSON API)
 """
 
+import gzip
+import hashlib
+import os
 import requests
+import time
+import numpy as np
+import orjson
 import pandas as pd
-import json
-from datetime import datetime
-from typing import Dict, Tuple, Optional
+import pyarrow as pa
+import pyarrow.csv as pacsv
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Tuple, Optional
+from urllib3.util.retry import Retry
 
-        try:
 # OECD SDMX-JSON API Endpoints
 # World data - Global maritime emissions totals
 URL_WORLD = "https://sdmx.oecd.org/public/rest/data/OECD.SDD.NAD.SEEA,DSD_MARITIME_TRANSPORT@DF_MARITIME_TRANSPORT,2.0/W.M.....EMISSIONS_POD..BULK_CARRIER+CHEM_TANKER+CONTAINER+GEN_CARGO+LIQ_GAS_TANKER+OIL_TANKER+OTHER_LIQ_TANKER+FERRY_PAX+CRUISE+FERRY_ROPAX+REFRIG_BULK+RO_RO+VEHICLE+YACHT+SERVICE_TUG+OFFSHORE+SERVICE_OTHER+MISC_FISH+MISC_OTHER.TER_DOM+TER_INT?dimensionAtObservation=AllDimensions"
@@ -23,131 +31,261 @@ URL_WORLD = "https://sdmx.oecd.org/public/rest/data/OECD.SDD.NAD.SEEA,DSD_MARITI
 # OECD countries data - Individual country emissions
 URL_OECD = "https://sdmx.oecd.org/public/rest/data/OECD.SDD.NAD.SEEA,DSD_MARITIME_TRANSPORT@DF_MARITIME_TRANSPORT,/.M.....EMISSIONS_POD..BULK_CARRIER+CHEM_TANKER+CONTAINER+GEN_CARGO+LIQ_GAS_TANKER+OIL_TANKER+OTHER_LIQ_TANKER+FERRY_PAX+CRUISE+FERRY_ROPAX+REFRIG_BULK+RO_RO+VEHICLE+YACHT+SERVICE_TUG+OFFSHORE+SERVICE_OTHER+MISC_FISH+MISC_OTHER.TER_DOM+TER_INT?dimensionAtObservation=AllDimensions"
 
-# HTTP headers for SDMX-JSON format
-HEADERS = {"Accept": "application/vnd.sdmx.data+json;version=1.0.0-wd"}
+# HTTP headers for SDMX-JSON format (compressed responses are much smaller)
+HEADERS = {
+    "Accept": "application/vnd.sdmx.data+json;version=1.0.0-wd",
+    "Accept-Encoding": "gzip, deflate",
+}
 
+# Shared HTTP session so repeated requests reuse the same connection.
+# Connection errors, timeouts and transient server errors are retried by
+# urllib3 with exponential backoff (waits of 0s, 4s and 8s in urllib3 2.x).
+# This only covers the request up to the response headers; an error while
+# reading the body is retried by fetch_sdmx_to_dataframe (BODY_RETRIES).
+RETRY = Retry(
+    total=3,
+    backoff_factor=2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=("GET",),
+)
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(max_retries=RETRY, pool_connections=4, pool_maxsize=4))
 
-def fetch_sdmx_to_dataframe(url: str, timeout: int = 120, retries: int = 3) -> Optional[pd.DataFrame]:
+# Attempts to re-download a body whose transfer broke off (waits of 2s, 4s, 8s)
+BODY_RETRIES = 3
+
+# Local cache of SDMX responses, revalidated with the server's ETag
+CACHE_DIR = ".cache"
+
+
+def parse_observation_keys(keys, n_obs: int, ndims: int) -> np.ndarray:
+    """
+    Parse SDMX observation keys ("0:1:2:...") into an integer index matrix.
+    
+    All keys are joined into one byte buffer and decoded with array
+    operations: every byte is tagged with the field it belongs to and its
+    digit position, and the digit values are summed per field. There is no
+    per-key split or int() call.
+    
+    Args:
+        keys (iterable): Observation keys, each with `ndims` colon-separated indices
+        n_obs (int): Number of keys
+        ndims (int): Number of dimensions per key
+        
+    Returns:
+        ndarray: int32 array of shape (n_obs, ndims) with the dimension indices
+    """
+    if n_obs == 0:
+        return np.empty((0, ndims), dtype=np.int32)
+    
+    # Terminate every field (including the last) with a ':' separator
+    buf = np.frombuffer(":".join(keys).encode("ascii") + b":", dtype=np.uint8)
+    is_sep = buf == ord(":")
+    field_ends = np.flatnonzero(is_sep)
+    if len(field_ends) != n_obs * ndims:
+        raise ValueError(f"Expected {ndims} dimensions in every observation key")
+    
+    # Field number and power of ten of every digit byte
+    digit_pos = np.flatnonzero(~is_sep)
+    digit_field = (np.cumsum(is_sep) - is_sep)[digit_pos]
+    power = field_ends[digit_field] - digit_pos - 1
+    values = (buf[digit_pos] - ord("0")).astype(np.int64) * 10 ** power
+    
+    fields = np.bincount(digit_field, weights=values, minlength=n_obs * ndims)
+    return fields.astype(np.int32).reshape(n_obs, ndims)
+
+
+def get_cache_paths(url: str) -> Tuple[str, str]:
+    """
+    Get the cached body and ETag file paths for an SDMX URL.
+    
+    Args:
+        url (str): OECD SDMX-JSON API endpoint URL
+        
+    Returns:
+        tuple: (body_path, etag_path) - gzip-compressed response body and its ETag
+    """
+    key = hashlib.sha1(url.encode()).hexdigest()
+    return os.path.join(CACHE_DIR, key + ".json.gz"), os.path.join(CACHE_DIR, key + ".etag")
+
+
+def save_cached_response(url: str, body: bytes, etag: str, label: str = "OECD"):
+    """
+    Store a response body (gzip-compressed) and its ETag in the local cache.
+    
+    Args:
+        url (str): OECD SDMX-JSON API endpoint URL
+        body (bytes): Raw JSON response body
+        etag (str): ETag header returned with the body
+        label (str): Dataset name for the warning message (default: "OECD")
+    """
+    body_path, etag_path = get_cache_paths(url)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(body_path, "wb") as f:
+            f.write(gzip.compress(body))
+        with open(etag_path, "w", encoding="utf-8") as f:
+            f.write(etag)
+    except OSError as e:
+        print(f"[{label}] ⚠️  Could not cache response: {e}")
+
+
+def fetch_sdmx_to_dataframe(url: str, timeout: int = 120, label: str = "OECD") -> Optional[pd.DataFrame]:
     """
     Fetch SDMX-JSON data from OECD API and convert to pandas DataFrame.
     
     This function:
-    1. Makes HTTP request to OECD SDMX API
+    1. Makes HTTP request to OECD SDMX API (retried by the session, see SESSION,
+       and restarted if the body download breaks off, see BODY_RETRIES)
     2. Parses the complex SDMX-JSON structure
     3. Extracts observations and dimensions
     4. Converts to a flat pandas DataFrame
     
+    CO2_Emissions is stored as float32, which halves memory use and CSV
+    formatting work but rounds some values. The figures are whole tonnes
+    up to about 18.1 million; float32 holds whole numbers exactly only up
+    to 2**24 (16,777,216), so larger values are rounded to an even number,
+    up to 1 tonne off (e.g. 18,096,683 is stored as 18,096,684). In the
+    current data this affects 3 rows per table, a relative error below 1e-7.
+    
     Args:
         url (str): OECD SDMX-JSON API endpoint URL
         timeout (int): Request timeout in seconds (default: 120)
-        retries (int): Number of retry attempts (default: 3)
+        label (str): Dataset name put in front of every progress message, so
+            the output of concurrent fetches can be told apart (default: "OECD")
         
     Returns:
         DataFrame: Pandas DataFrame with CO2 emissions data, or None if error
     """
-    for attempt in range(retries):
-        try:
-            print(f"\n📡 Fetching data from OECD API (Attempt {attempt + 1}/{retries})...")
-            print(f"   URL: {url[:80]}...")
-            print(f"   ⏱️  This may take 1-2 minutes for large datasets...")
-            
-            # Make HTTP request to OECD API with longer timeout
-            response = requests.get(url, headers=HEADERS, timeout=timeout)
-            
-            if response.status_code != 200:
-                print(f"✗ Failed to fetch data: HTTP {response.status_code}")
-                if attempt < retries - 1:
-                    print(f"   Retrying in 5 seconds...")
-                    import time
-                    time.sleep(5)
-                    continue
-                return None
-            
-            print(f"✓ Data received successfully ({len(response.content):,} bytes)")
-            
-            # Parse JSON response
-            data = response.json()
-            
-            # Extract observations (the actual data points)
-            dataset = data["data"]["dataSets"][0]["observations"]
-            
-            # Extract dimension structure (metadata about the data)
-            structure = data["data"]["structure"]["dimensions"]["observation"]
-            dim_names = [d["id"] for d in structure]
-            
-            print(f"📊 Processing {len(dataset)} observations...")
-            print(f"   Dimensions: {', '.join(dim_names)}")
-            
-            # Convert observations to list of dictionaries
-            rows = []
-            for key, value in dataset.items():
-                # Key format: "0:1:2:3:4..." represents dimension indices
-                dims = key.split(":")
-                
-                # Build record by mapping dimension indices to their values
-                record = {
-                    dim_names[i]: structure[i]["values"][int(dims[i])]["name"] 
-                    for i in range(len(dims))
-                }
-                
-                # Add CO2 emissions value
-                record["CO2_Emissions"] = value[0]
-                
-                rows.append(record)
-            
-            # Convert to pandas DataFrame
-            df = pd.DataFrame(rows)
-            
-            print(f"✓ Created DataFrame: {len(df)} rows × {len(df.columns)} columns")
-            print(f"   Columns: {list(df.columns)}")
-            
-            return df
+    try:
+        print(f"\n[{label}] 📡 Fetching data from OECD API...")
+        print(f"[{label}]    URL: {url[:80]}...")
+        print(f"[{label}]    ⏱️  This may take 1-2 minutes for large datasets...")
+        
+        # Revalidate a cached copy instead of downloading it again
+        body_path, etag_path = get_cache_paths(url)
+        request_headers = {}
+        if os.path.exists(body_path) and os.path.exists(etag_path):
+            with open(etag_path, encoding="utf-8") as f:
+                request_headers["If-None-Match"] = f.read()
+        
+        # Make HTTP request to OECD API with longer timeout, streaming the body.
+        # A connection lost while the body is read is not covered by the
+        # session's urllib3 retries, so the download is restarted here
+        for attempt in range(BODY_RETRIES + 1):
+            interrupted = None
+            with SESSION.get(url, headers=request_headers, timeout=timeout, stream=True) as response:
+                if response.status_code == 304:
+                    print(f"[{label}] ✓ Data unchanged since last fetch (HTTP 304), using cached copy")
+                    with open(body_path, "rb") as f:
+                        body = gzip.decompress(f.read())
+                elif response.status_code != 200:
+                    print(f"[{label}] ✗ Failed to fetch data: HTTP {response.status_code}")
+                    return None
+                else:
+                    try:
+                        # Read the body in chunks rather than via response.content, which
+                        # would keep a second cached copy on the response object
+                        body = b"".join(response.iter_content(chunk_size=1 << 16))
+                        if response.headers.get("ETag"):
+                            save_cached_response(url, body, response.headers["ETag"], label)
+                    except (requests.exceptions.ChunkedEncodingError, requests.exceptions.ConnectionError) as e:
+                        if attempt == BODY_RETRIES:
+                            raise
+                        interrupted = e
+            if interrupted is None:
+                break
+            wait = RETRY.backoff_factor * 2 ** attempt
+            print(f"[{label}] ⚠️  Download interrupted ({interrupted}), retrying in {wait:.0f}s...")
+            time.sleep(wait)
+        
+        print(f"[{label}] ✓ Data received successfully ({len(body):,} bytes)")
+        
+        # Parse JSON response, then release the raw bytes
+        data = orjson.loads(body)
+        del body
+        
+        # Extract observations (the actual data points)
+        dataset = data["data"]["dataSets"][0]["observations"]
         
-        except requests.exceptions.Timeout:
-            print(f"✗ Request timed out after {timeout} seconds")
-            if attempt < retries - 1:
-                print(f"   Retrying with longer timeout...")
-                timeout = timeout + 60  # Add 60 seconds each retry
-                continue
-            return None
-        except requests.exceptions.RequestException as e:
-            print(f"✗ Network error: {e}")
-            if attempt < retries - 1:
-                print(f"   Retrying in 5 seconds...")
-                import time
-                time.sleep(5)
-                continue
-            return None
-        except KeyError as e:
-            print(f"✗ Data structure error: Missing key {e}")
-            return None
-        except Exception as e:
-            print(f"✗ Unexpected error: {e}")
-            return None
-    
-    return None
+        # Extract dimension structure (metadata about the data)
+        structure = data["data"]["structure"]["dimensions"]["observation"]
+        dim_names = [d["id"] for d in structure]
+        
+        print(f"[{label}] 📊 Processing {len(dataset)} observations...")
+        print(f"[{label}]    Dimensions: {', '.join(dim_names)}")
+        
+        # Convert observations to one array per column (structure of arrays)
+        ndims = len(dim_names)
+        n_obs = len(dataset)
+        
+        # Resolve dimension index -> value name once per dimension
+        value_names = [[v["name"] for v in structure[i]["values"]] for i in range(ndims)]
+        
+        # Key format: "0:1:2:3:4..." represents dimension indices;
+        # decode every key in one pass into an (observations x dimensions) matrix
+        idx = parse_observation_keys(dataset.keys(), n_obs, ndims)
+        
+        # CO2 emissions values as float32 (missing observations become NaN)
+        co2_col = np.fromiter((value[0] for value in dataset.values()), dtype=np.float32, count=n_obs)
+        
+        # Dimension columns are categoricals built straight from the key
+        # indices, so value-name strings are never repeated per row
+        columns = {}
+        for i in range(ndims):
+            # factorize guards against two dimension values sharing a name
+            name_codes, categories = pd.factorize(pd.Index(value_names[i], dtype=object))
+            columns[dim_names[i]] = pd.Categorical.from_codes(name_codes[idx[:, i]], categories=categories)
+        columns["CO2_Emissions"] = co2_col
+        
+        # Wrap the pre-typed columns in a DataFrame without copying them or
+        # re-inferring their dtypes
+        df = pd.DataFrame(columns, index=pd.RangeIndex(n_obs), copy=False)
+        
+        print(f"[{label}] ✓ Created DataFrame: {len(df)} rows × {len(df.columns)} columns")
+        print(f"[{label}]    Columns: {list(df.columns)}")
+        
+        return df
+    
+    except requests.exceptions.Timeout:
+        print(f"[{label}] ✗ Request timed out after {timeout} seconds")
+        return None
+    except requests.exceptions.RequestException as e:
+        print(f"[{label}] ✗ Network error: {e}")
+        return None
+    except KeyError as e:
+        print(f"[{label}] ✗ Data structure error: Missing key {e}")
+        return None
+    except Exception as e:
+        print(f"[{label}] ✗ Unexpected error: {e}")
+        return None
 
 
 def add_group_column(df: pd.DataFrame, group_name: str) -> pd.DataFrame:
     """
     Add a 'Group' column to identify the data source.
     
+    The column is added in place (callers don't reuse the frame without it)
+    as a single-category Categorical, so it costs one int8 code per row.
+    
     Args:
         df (DataFrame): Input DataFrame
         group_name (str): Group identifier (e.g., "World Total" or "OECD Country")
         
     Returns:
-        DataFrame: DataFrame with added Group column
+        DataFrame: The same DataFrame with the added Group column
     """
-    df_copy = df.copy()
-    df_copy["Group"] = group_name
-    return df_copy
+    df["Group"] = pd.Categorical.from_codes(np.zeros(len(df), dtype=np.int8), categories=[group_name])
+    return df
 
 
 def save_to_csv(df: pd.DataFrame, filename: str) -> bool:
     """
     Save DataFrame to CSV file.
     
+    Uses PyArrow's multithreaded CSV writer (string fields are quoted).
+    
     Args:
         df (DataFrame): DataFrame to save
         filename (str): Output filename
@@ -156,7 +294,7 @@ def save_to_csv(df: pd.DataFrame, filename: str) -> bool:
         bool: True if successful, False otherwise
     """
     try:
-        df.to_csv(filename, index=False, encoding='utf-8')
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filename)
         print(f"✓ Saved to '{filename}'")
         return True
     except Exception as e:
@@ -164,19 +302,52 @@ def save_to_csv(df: pd.DataFrame, filename: str) -> bool:
         return False
 
 
-def save_to_json(df: pd.DataFrame, filename: str) -> bool:
+def save_to_parquet(df: pd.DataFrame, filename: str) -> bool:
+    """
+    Save DataFrame to a Parquet file.
+    
+    Parquet keeps the column types (dimension columns stay categorical) and
+    dictionary-encodes the repeated strings, so it is much smaller and faster
+    to load than the CSV copy.
+    
+    Args:
+        df (DataFrame): DataFrame to save
+        filename (str): Output filename
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    try:
+        df.to_parquet(filename, engine="pyarrow", compression="zstd", index=False)
+        print(f"✓ Saved to '{filename}'")
+        return True
+    except Exception as e:
+        print(f"✗ Error saving Parquet: {e}")
+        return False
+
+
+def save_to_json(df: pd.DataFrame, filename: str, lines: bool = True) -> bool:
     """
     Save DataFrame to JSON file.
     
+    By default writes newline-delimited JSON (one record per line) so the
+    file can be read back record by record; records are encoded with orjson.
+    
     Args:
         df (DataFrame): DataFrame to save
         filename (str): Output filename
+        lines (bool): Write NDJSON if True, otherwise an indented JSON array (default: True)
         
     Returns:
         bool: True if successful, False otherwise
     """
     try:
-        df.to_json(filename, orient='records', indent=2)
+        records = df.to_dict(orient='records')
+        with open(filename, 'wb') as f:
+            if lines:
+                f.writelines(orjson.dumps(r, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n" for r in records)
+            else:
+                f.write(orjson.dumps(records, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_INDENT_2))
         print(f"✓ Saved to '{filename}'")
         return True
     except Exception as e:
@@ -209,15 +380,17 @@ def display_data_summary(df: pd.DataFrame, title: str):
         print(f"   Sample: {', '.join(df['REF_AREA'].unique()[:5].tolist())}...")
     
     if 'TIME_PERIOD' in df.columns:
-        years = sorted(df['TIME_PERIOD'].unique())
+        years = np.sort(np.asarray(df['TIME_PERIOD'].unique(), dtype=str))
         print(f"\n📅 Time Period: {years[0]} to {years[-1]} ({len(years)} periods)")
     
     if 'CO2_Emissions' in df.columns:
+        # Aggregate in float64 so the total doesn't accumulate float32 rounding
+        stats = df['CO2_Emissions'].astype(np.float64).agg(['sum', 'mean', 'min', 'max'])
         print(f"\n💨 CO2 Emissions Statistics:")
-        print(f"   Total: {df['CO2_Emissions'].sum():,.2f}")
-        print(f"   Mean: {df['CO2_Emissions'].mean():,.2f}")
-        print(f"   Min: {df['CO2_Emissions'].min():,.2f}")
-        print(f"   Max: {df['CO2_Emissions'].max():,.2f}")
+        print(f"   Total: {stats.loc['sum']:,.2f}")
+        print(f"   Mean: {stats.loc['mean']:,.2f}")
+        print(f"   Min: {stats.loc['min']:,.2f}")
+        print(f"   Max: {stats.loc['max']:,.2f}")
     
     print(f"\n🔍 Sample Data (first 5 rows):")
     print(df.head().to_string())
@@ -234,22 +407,25 @@ def fetch_all_maritime_data() -> Tuple[Optional[pd.DataFrame], Optional[pd.DataF
     print("OECD MARITIME CO2 EMISSIONS DATA FETCHER")
     print("="*70)
     
-    # Fetch World totals
-    print("\n📍 STEP 1: Fetching World Total Data")
+    # Fetch World totals and OECD countries concurrently (both are network-bound)
+    print("\n📍 Fetching World Total and OECD Countries Data")
     print("-" * 70)
-    world_df = fetch_sdmx_to_dataframe(URL_WORLD)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        world_future = executor.submit(fetch_sdmx_to_dataframe, URL_WORLD, label="World")
+        oecd_future = executor.submit(fetch_sdmx_to_dataframe, URL_OECD, label="OECD countries")
+        world_df, oecd_df = world_future.result(), oecd_future.result()
     
+    # Summaries are printed once both fetches return so output isn't interleaved
+    print("\n📍 STEP 1: World Total Data")
+    print("-" * 70)
     if world_df is not None:
         world_df = add_group_column(world_df, "World Total")
         display_data_summary(world_df, "WORLD TOTAL EMISSIONS")
     else:
         print("⚠️  Failed to fetch World data")
     
-    # Fetch OECD countries
-    print("\n📍 STEP 2: Fetching OECD Countries Data")
+    print("\n📍 STEP 2: OECD Countries Data")
     print("-" * 70)
-    oecd_df = fetch_sdmx_to_dataframe(URL_OECD)
-    
     if oecd_df is not None:
         oecd_df = add_group_column(oecd_df, "OECD Country")
         display_data_summary(oecd_df, "OECD COUNTRIES EMISSIONS")
@@ -263,6 +439,9 @@ def combine_datasets(world_df: pd.DataFrame, oecd_df: pd.DataFrame) -> Optional[
     """
     Combine World and OECD datasets into one DataFrame.
     
+    Categorical columns stay categorical: each frame's categories are
+    extended to the union of both, which pd.concat needs to keep them.
+    
     Args:
         world_df (DataFrame): World totals data
         oecd_df (DataFrame): OECD countries data
@@ -273,7 +452,17 @@ def combine_datasets(world_df: pd.DataFrame, oecd_df: pd.DataFrame) -> Optional[
     try:
         print("\n🔄 Combining World and OECD datasets...")
         
-        combined = pd.concat([world_df, oecd_df], ignore_index=True)
+        # Shallow copies, so aligning categories leaves the inputs untouched
+        frames = [world_df.copy(deep=False), oecd_df.copy(deep=False)]
+        for col in world_df.columns:
+            dtypes = [f[col].dtype for f in frames]
+            if all(isinstance(d, pd.CategoricalDtype) for d in dtypes):
+                # Union of categories in first-seen order; pandas only keeps
+                # a categorical through concat when the categories match
+                union = list(dict.fromkeys(c for d in dtypes for c in d.categories))
+                for f in frames:
+                    f[col] = f[col].cat.set_categories(union)
+        combined = pd.concat(frames, ignore_index=True)
         
         print(f"✓ Combined dataset created: {len(combined)} total rows")
         print(f"   World Total: {len(world_df)} rows")
@@ -304,20 +493,22 @@ def main():
     if world_df is not None:
         print("\n📁 Saving World Total data...")
         save_to_csv(world_df, "maritime_world_total.csv")
+        save_to_parquet(world_df, "maritime_world_total.parquet")
     
     if oecd_df is not None:
         print("\n📁 Saving OECD Countries data...")
         save_to_csv(oecd_df, "maritime_oecd_countries.csv")
+        save_to_parquet(oecd_df, "maritime_oecd_countries.parquet")
     
     # Summary
     print("\n" + "="*70)
     print("✓ PROCESS COMPLETED!")
     print("="*70)
-    print("\n📂 Output Files (2 separate CSV tables):")
+    print("\n📂 Output Files (2 separate tables, CSV + Parquet):")
     if world_df is not None:
-        print("   • maritime_world_total.csv")
+        print("   • maritime_world_total.csv / .parquet")
     if oecd_df is not None:
-        print("   • maritime_oecd_countries.csv")
+        print("   • maritime_oecd_countries.csv / .parquet")
     
     
 
@@ -1,30 +1,254 @@
 import streamlit as st
 import pandas as pd
-import json
+import orjson
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
 import numpy as np
-from scipy import stats
+import glob
 import os
+import threading
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 
-st.set_page_config(
-    page_title="Climate Analysis Dashboard",
-    page_icon="🌍",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+# ISO3 country code -> display name
+COUNTRY_NAMES = {
+    'IND': 'India', 'BRA': 'Brazil', 'DEU': 'Germany', 'GBR': 'United Kingdom', 'ITA': 'Italy',
+    'ESP': 'Spain', 'BEL': 'Belgium', 'AUT': 'Austria', 'ARE': 'UAE', 'ARG': 'Argentina',
+    'EGY': 'Egypt', 'COG': 'Republic of the Congo', 'COL': 'Colombia', 'CIV': "Côte d'Ivoire", 'CHL': 'Chile',
+    'AGO': 'Angola', 'ALB': 'Albania', 'AND': 'Andorra', 'ARM': 'Armenia', 'AUS': 'Australia',
+    'ATG': 'Antigua and Barbuda', 'AZE': 'Azerbaijan', 'BDI': 'Burundi', 'BEN': 'Benin', 'BFA': 'Burkina Faso',
+    'BGD': 'Bangladesh', 'BGR': 'Bulgaria', 'BHR': 'Bahrain', 'BHS': 'Bahamas', 'BIH': 'Bosnia and Herzegovina',
+    'BLR': 'Belarus', 'BLZ': 'Belize', 'BMU': 'Bermuda', 'BOL': 'Bolivia', 'BRB': 'Barbados',
+    'BRN': 'Brunei', 'BTN': 'Bhutan', 'BWA': 'Botswana', 'CAF': 'Central African Republic', 'CAN': 'Canada',
+    'CHE': 'Switzerland', 'CHN': 'China', 'CYP': 'Cyprus', 'CZE': 'Czechia', 'DNK': 'Denmark',
+    'DOM': 'Dominican Republic', 'DZA': 'Algeria', 'ECU': 'Ecuador', 'EST': 'Estonia', 'ETH': 'Ethiopia',
+    'FIN': 'Finland', 'FJI': 'Fiji', 'FRA': 'France', 'GAB': 'Gabon', 'GHA': 'Ghana',
+    'GRC': 'Greece', 'GRD': 'Grenada', 'GTM': 'Guatemala', 'GUY': 'Guyana', 'HND': 'Honduras',
+    'HRV': 'Croatia', 'HTI': 'Haiti', 'HUN': 'Hungary', 'IDN': 'Indonesia', 'IRL': 'Ireland',
+    'IRN': 'Iran', 'IRQ': 'Iraq', 'ISL': 'Iceland', 'ISR': 'Israel', 'JAM': 'Jamaica',
+    'JOR': 'Jordan', 'JPN': 'Japan', 'KAZ': 'Kazakhstan', 'KEN': 'Kenya', 'KGZ': 'Kyrgyzstan',
+    'KHM': 'Cambodia', 'KOR': 'South Korea', 'KWT': 'Kuwait', 'LAO': 'Laos', 'LBN': 'Lebanon',
+    'LBR': 'Liberia', 'LBY': 'Libya', 'LCA': 'Saint Lucia', 'LIE': 'Liechtenstein', 'LKA': 'Sri Lanka',
+    'LSO': 'Lesotho', 'LTU': 'Lithuania', 'LUX': 'Luxembourg', 'LVA': 'Latvia', 'MAR': 'Morocco',
+    'MDA': 'Moldova', 'MDG': 'Madagascar', 'MDV': 'Maldives', 'MEX': 'Mexico', 'MKD': 'North Macedonia',
+    'MLI': 'Mali', 'MLT': 'Malta', 'MMR': 'Myanmar', 'MNE': 'Montenegro', 'MNG': 'Mongolia',
+    'MOZ': 'Mozambique', 'MRT': 'Mauritania', 'MUS': 'Mauritius', 'MWI': 'Malawi', 'MYS': 'Malaysia',
+    'NAM': 'Namibia', 'NCL': 'New Caledonia', 'NER': 'Niger', 'NGA': 'Nigeria', 'NIC': 'Nicaragua',
+    'NLD': 'Netherlands', 'NOR': 'Norway', 'NPL': 'Nepal', 'NZL': 'New Zealand', 'OMN': 'Oman',
+    'PAK': 'Pakistan', 'PAN': 'Panama', 'PER': 'Peru', 'PHL': 'Philippines', 'PNG': 'Papua New Guinea',
+    'POL': 'Poland', 'PRT': 'Portugal', 'PRY': 'Paraguay', 'QAT': 'Qatar', 'ROU': 'Romania',
+    'RUS': 'Russia', 'RWA': 'Rwanda', 'SAU': 'Saudi Arabia', 'SDN': 'Sudan', 'SEN': 'Senegal',
+    'SGP': 'Singapore', 'SLB': 'Solomon Islands', 'SLE': 'Sierra Leone', 'SLV': 'El Salvador', 'SMR': 'San Marino',
+    'SOM': 'Somalia', 'SRB': 'Serbia', 'SSD': 'South Sudan', 'SUR': 'Suriname', 'SVK': 'Slovakia',
+    'SVN': 'Slovenia', 'SWE': 'Sweden', 'SWZ': 'Eswatini', 'SYC': 'Seychelles', 'SYR': 'Syria',
+    'TCD': 'Chad', 'TGO': 'Togo', 'THA': 'Thailand', 'TJK': 'Tajikistan', 'TKM': 'Turkmenistan',
+    'TLS': 'Timor-Leste', 'TON': 'Tonga', 'TTO': 'Trinidad and Tobago', 'TUN': 'Tunisia', 'TUR': 'Turkey',
+    'TWN': 'Taiwan', 'TZA': 'Tanzania', 'UGA': 'Uganda', 'UKR': 'Ukraine', 'URY': 'Uruguay',
+    'USA': 'United States', 'UZB': 'Uzbekistan', 'VEN': 'Venezuela', 'VNM': 'Vietnam', 'VUT': 'Vanuatu',
+    'WSM': 'Samoa', 'YEM': 'Yemen', 'ZAF': 'South Africa', 'ZMB': 'Zambia', 'ZWE': 'Zimbabwe'
+}
 
-def get_analysis_options(world_maritime, sea_level_df):
-    options = []
-    if world_maritime is not None:
-        options.append("🚢 CO2 Emissions")
-    options.append("🌡️ Climate Temperature")
-    if sea_level_df is not None:
-        options.append("🌊 Sea Level")
-    return options
+# ISO3 country code -> continent
+COUNTRY_TO_CONTINENT = {
+    # Africa
+    'DZA': 'Africa', 'AGO': 'Africa', 'BEN': 'Africa', 'BWA': 'Africa', 'BFA': 'Africa', 'BDI': 'Africa',
+    'CMR': 'Africa', 'CPV': 'Africa', 'CAF': 'Africa', 'TCD': 'Africa', 'COM': 'Africa', 'COG': 'Africa',
+    'CIV': 'Africa', 'COD': 'Africa', 'DJI': 'Africa', 'EGY': 'Africa', 'GNQ': 'Africa', 'ERI': 'Africa',
+    'SWZ': 'Africa', 'ETH': 'Africa', 'GAB': 'Africa', 'GMB': 'Africa', 'GHA': 'Africa', 'GIN': 'Africa',
+    'GNB': 'Africa', 'KEN': 'Africa', 'LSO': 'Africa', 'LBR': 'Africa', 'LBY': 'Africa', 'MDG': 'Africa',
+    'MWI': 'Africa', 'MLI': 'Africa', 'MRT': 'Africa', 'MUS': 'Africa', 'MYT': 'Africa', 'MAR': 'Africa',
+    'MOZ': 'Africa', 'NAM': 'Africa', 'NER': 'Africa', 'NGA': 'Africa', 'REU': 'Africa', 'RWA': 'Africa',
+    'STP': 'Africa', 'SEN': 'Africa', 'SYC': 'Africa', 'SLE': 'Africa', 'SOM': 'Africa', 'ZAF': 'Africa',
+    'SSD': 'Africa', 'SDN': 'Africa', 'TZA': 'Africa', 'TGO': 'Africa', 'TUN': 'Africa', 'UGA': 'Africa',
+    'ZMB': 'Africa', 'ZWE': 'Africa',
+    # Asia
+    'AFG': 'Asia', 'ARM': 'Asia', 'AZE': 'Asia', 'BHR': 'Asia', 'BGD': 'Asia', 'BTN': 'Asia', 'BRN': 'Asia',
+    'KHM': 'Asia', 'CHN': 'Asia', 'CYP': 'Asia', 'GEO': 'Asia', 'IND': 'Asia', 'IDN': 'Asia', 'IRN': 'Asia',
+    'IRQ': 'Asia', 'ISR': 'Asia', 'JPN': 'Asia', 'JOR': 'Asia', 'KAZ': 'Asia', 'KWT': 'Asia', 'KGZ': 'Asia',
+    'LAO': 'Asia', 'LBN': 'Asia', 'MAC': 'Asia', 'MYS': 'Asia', 'MDV': 'Asia', 'MNG': 'Asia', 'MMR': 'Asia',
+    'NPL': 'Asia', 'PRK': 'Asia', 'OMN': 'Asia', 'PAK': 'Asia', 'PSE': 'Asia', 'PHL': 'Asia', 'QAT': 'Asia',
+    'SAU': 'Asia', 'SGP': 'Asia', 'KOR': 'Asia', 'LKA': 'Asia', 'SYR': 'Asia', 'TWN': 'Asia', 'TJK': 'Asia',
+    'THA': 'Asia', 'TLS': 'Asia', 'TUR': 'Asia', 'TKM': 'Asia', 'ARE': 'Asia', 'UZB': 'Asia', 'VNM': 'Asia',
+    'YEM': 'Asia',
+    # Europe
+    'ALB': 'Europe', 'AND': 'Europe', 'AUT': 'Europe', 'BLR': 'Europe', 'BEL': 'Europe', 'BIH': 'Europe',
+    'BGR': 'Europe', 'HRV': 'Europe', 'CZE': 'Europe', 'DNK': 'Europe', 'EST': 'Europe', 'FRO': 'Europe',
+    'FIN': 'Europe', 'FRA': 'Europe', 'DEU': 'Europe', 'GIB': 'Europe', 'GRC': 'Europe', 'GGY': 'Europe',
+    'HUN': 'Europe', 'ISL': 'Europe', 'IRL': 'Europe', 'IMN': 'Europe', 'ITA': 'Europe', 'JEY': 'Europe',
+    'LVA': 'Europe', 'LIE': 'Europe', 'LTU': 'Europe', 'LUX': 'Europe', 'MLT': 'Europe', 'MDA': 'Europe',
+    'MCO': 'Europe', 'MNE': 'Europe', 'NLD': 'Europe', 'MKD': 'Europe', 'NOR': 'Europe', 'POL': 'Europe',
+    'PRT': 'Europe', 'ROU': 'Europe', 'RUS': 'Europe', 'SMR': 'Europe', 'SRB': 'Europe', 'SVK': 'Europe',
+    'SVN': 'Europe', 'ESP': 'Europe', 'SWE': 'Europe', 'CHE': 'Europe', 'UKR': 'Europe', 'GBR': 'Europe',
+    'VAT': 'Europe',
+    # North America
+    'AIA': 'North America', 'ATG': 'North America', 'BHS': 'North America', 'BRB': 'North America',
+    'BLZ': 'North America', 'BMU': 'North America', 'CAN': 'North America', 'CYM': 'North America',
+    'CRI': 'North America', 'CUB': 'North America', 'DMA': 'North America', 'DOM': 'North America',
+    'SLV': 'North America', 'GRL': 'North America', 'GRD': 'North America', 'GLP': 'North America',
+    'GTM': 'North America', 'HTI': 'North America', 'HND': 'North America', 'JAM': 'North America',
+    'MTQ': 'North America', 'MEX': 'North America', 'MSR': 'North America', 'ANT': 'North America',
+    'NIC': 'North America', 'PAN': 'North America', 'PRI': 'North America', 'KNA': 'North America',
+    'LCA': 'North America', 'SPM': 'North America', 'VCT': 'North America', 'TTO': 'North America',
+    'TCA': 'North America', 'USA': 'North America', 'VIR': 'North America',
+    # South America
+    'ARG': 'South America', 'BOL': 'South America', 'BRA': 'South America', 'CHL': 'South America',
+    'COL': 'South America', 'ECU': 'South America', 'FLK': 'South America', 'GUF': 'South America',
+    'GUY': 'South America', 'PRY': 'South America', 'PER': 'South America', 'SUR': 'South America',
+    'URY': 'South America', 'VEN': 'South America',
+    # Oceania
+    'ASM': 'Oceania', 'AUS': 'Oceania', 'COK': 'Oceania', 'FJI': 'Oceania', 'PYF': 'Oceania',
+    'GUM': 'Oceania', 'KIR': 'Oceania', 'MHL': 'Oceania', 'FSM': 'Oceania', 'NRU': 'Oceania',
+    'NCL': 'Oceania', 'NZL': 'Oceania', 'NIU': 'Oceania', 'NFK': 'Oceania', 'MNP': 'Oceania',
+    'PLW': 'Oceania', 'PNG': 'Oceania', 'WSM': 'Oceania', 'SLB': 'Oceania', 'TKL': 'Oceania',
+    'TON': 'Oceania', 'TUV': 'Oceania', 'VUT': 'Oceania',
+}
+
+# Map scope and centre for each continent choice
+CONTINENT_VIEWS = MappingProxyType({
+    'World': {'scope': 'world', 'center': None},
+    'Africa': {'scope': 'africa', 'center': {'lat': 0, 'lon': 20}},
+    'Asia': {'scope': 'asia', 'center': {'lat': 30, 'lon': 90}},
+    'Europe': {'scope': 'europe', 'center': {'lat': 50, 'lon': 10}},
+    'North America': {'scope': 'north america', 'center': {'lat': 40, 'lon': -100}},
+    'South America': {'scope': 'south america', 'center': {'lat': -15, 'lon': -60}},
+    # Plotly has no Oceania scope: frame the region with a lat/lon window instead of centring the world map
+    'Oceania': {'scope': 'world', 'center': None, 'projection_type': 'mercator', 'lataxis_range': [-50, 10], 'lonaxis_range': [110, 180]}
+})
 
-st.markdown("""
+MONTH_MAP = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
+
+# Static layout of each dashboard chart, built once at import
+CHART_LAYOUTS = {
+    'temperature_co2': dict(
+        title='Global Average Temperature and Maritime CO₂ Emissions (2019-2024)',
+        xaxis=dict(
+            title=None,
+            showgrid=False,
+            showticklabels=True,
+            tickfont=dict(
+                color='#fff',
+                size=12,
+                family='Arial, sans-serif',
+                weight='normal'
+            ),
+            tickmode='auto',
+            ticks='outside',
+            tickangle=0,
+            showline=False,
+            zeroline=False,
+            type='category'
+        ),
+        yaxis=dict(
+            title=None,
+            showgrid=False,
+            showticklabels=False,
+            showline=False,
+            zeroline=False
+        ),
+        yaxis2=dict(
+            title=None,
+            showgrid=False,
+            showticklabels=False,
+            showline=False,
+            zeroline=False,
+            anchor='x',
+            overlaying='y',
+            side='right'
+        ),
+        hovermode='x unified',
+        height=400,
+        width=380,
+        showlegend=True,
+        legend=dict(x=0.01, y=0.99)
+    ),
+    'monthly_emissions': dict(
+        title='Monthly Maritime CO₂ Emissions (2019-2024)',
+        height=400,
+        xaxis=dict(tickfont=dict(size=14), showline=False, zeroline=False),
+        yaxis=dict(title=None, showline=False, zeroline=False),
+        margin=dict(l=30, r=30, t=40, b=30),
+        showlegend=True
+    ),
+    'top_vessels': dict(
+        height=400,
+        xaxis=dict(tickfont=dict(size=14), showline=False, zeroline=False),
+        yaxis=dict(
+            title=None,
+            showgrid=False,
+            showticklabels=False,
+            showline=False,
+            zeroline=False
+        ),
+        margin=dict(l=30, r=30, t=40, b=30),
+        showlegend=False,
+        title='Top 10 Vessel Types by CO₂ Emissions'
+    ),
+    'voyage_pie': dict(
+        height=400,
+        margin=dict(l=30, r=30, t=40, b=30),
+        showlegend=False,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)'
+    ),
+    'voyage_stacked': dict(
+        barmode='stack',
+        height=400,
+        margin=dict(l=30, r=30, t=40, b=30),
+        xaxis=dict(
+            tickfont=dict(size=16, color='#fff'),
+            title=None
+        ),
+        yaxis=dict(
+            title=None,
+            showgrid=False
+        ),
+        legend=dict(
+            title='',
+            font=dict(size=16, color='#fff'),
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        ),
+        plot_bgcolor='rgba(0,0,0,0)'
+    ),
+    'climate_connection': dict(
+        title='The Climate Connection: All Three Indicators Rising Together',
+        # Each indicator keeps its own units on its own axis; the third sits right of the second
+        xaxis=dict(title='Year', dtick=1, showgrid=False, zeroline=False, showline=False, domain=[0, 0.88]),
+        yaxis=dict(title='Temperature (°C)', color='#ff7f0e', showgrid=False, zeroline=False, showline=False),
+        yaxis2=dict(title='Sea Level (mm)', color='#1f77b4', overlaying='y', side='right', showgrid=False, zeroline=False),
+        yaxis3=dict(title='CO2 (Mt)', color='#2ca02c', overlaying='y', side='right', anchor='free', position=1, showgrid=False, zeroline=False),
+        height=340,  # reduced height
+        hovermode='x unified',
+        legend=dict(
+            orientation='h',
+            yanchor='bottom',
+            y=1.02,
+            xanchor='right',
+            x=1
+        )
+    ),
+    'top_regions': dict(
+        height=340,  # reduced height
+        xaxis=dict(tickfont=dict(size=16)),
+        yaxis=dict(title=None, showgrid=False),
+        margin=dict(l=30, r=30, t=60, b=30),
+        showlegend=False
+    ),
+    'monthly_sea_level': dict(
+        height=340,  # reduced height
+        xaxis=dict(title='Month', tickfont=dict(size=16)),
+        yaxis=dict(title=None, showgrid=True),
+        margin=dict(l=30, r=30, t=60, b=30),
+        showlegend=False
+    )
+}
+
+DASHBOARD_CSS = """
 <style>
     .main-header {
         font-size: 2.1rem;
@@ -47,6 +271,25 @@ st.markdown("""
         border-radius: 0.3rem;
         text-align: center;
     }
+    .kpi-row {
+        display: flex;
+        gap: 1rem;
+    }
+    .kpi {
+        flex: 1;
+    }
+    .kpi-label {
+        font-size: 0.95em;
+        color: #888;
+    }
+    .kpi-value {
+        font-size: 1.3em;
+        font-weight: bold;
+    }
+    .kpi-note {
+        font-size: 0.8em;
+        color: #888;
+    }
     section[data-testid="stSidebar"] > div:first-child {
         background-color: #000 !important;
         color: #fff !important;
@@ -55,144 +298,138 @@ st.markdown("""
         color: #fff !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
+
+st.set_page_config(
+    page_title="Climate Analysis Dashboard",
+    page_icon="🌍",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+def get_analysis_options(world_maritime, sea_level_df):
+    options = []
+    if world_maritime is not None:
+        options.append("🚢 CO2 Emissions")
+    options.append("🌡️ Climate Temperature")
+    if sea_level_df is not None:
+        options.append("🌊 Sea Level")
+    return options
+
+def kpi(label, value, color='#ff7f0e', note=None):
+    """HTML for one KPI card; lay several out with a .kpi-row container."""
+    note_html = f"<div class='kpi-note'>{note}</div>" if note else ""
+    return f"<div class='kpi'><div class='kpi-label'>{label}</div><div class='kpi-value' style='color:{color};'>{value}</div>{note_html}</div>"
+
+def temperature_style(value):
+    """Cell style for a temperature: blue below freezing, orange otherwise."""
+    return f"color:{'#313695' if value < 0 else '#ff7f0e'};"
+
+# Page styles, re-sent on every rerun (Streamlit drops elements a run doesn't emit)
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
+
+# Parsed, typed copies of the data files, reused across sessions and restarts
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+# Part of every cache file name: bump it whenever a build_* function changes
+# its output (columns, dtypes), so caches written by older code are not reused
+CACHE_VERSION = 1
+
+def load_or_build(source_paths, cache_name, builder):
+    """Load a DataFrame from its Parquet cache if it is at least as new as the source files, otherwise build and cache it."""
+    cache_path = os.path.join(CACHE_DIR, f'{cache_name}.v{CACHE_VERSION}.parquet')
+    sources = [path for path in source_paths if os.path.exists(path)]
+    if sources and os.path.exists(cache_path) and all(os.path.getmtime(cache_path) >= os.path.getmtime(path) for path in sources):
+        try:
+            return pd.read_parquet(cache_path, engine='pyarrow')
+        except Exception:
+            pass  # unreadable cache, rebuild it below
+    df = builder()
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        df.to_parquet(cache_path, engine='pyarrow', compression='zstd', index=False)
+        # Drop this table's caches from other cache versions
+        for stale in glob.glob(os.path.join(CACHE_DIR, f'{glob.escape(cache_name)}.*parquet')):
+            if stale != cache_path:
+                os.remove(stale)
+    except Exception:
+        pass  # caching is best effort, e.g. on a read-only deployment
+    return df
 
 @st.cache_data
 def load_climate_data():
     """Load and process climate data from JSON file."""
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    with open(os.path.join(script_dir, 'climate_data.json'), 'r') as f:
-        data = json.load(f)
+    json_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'climate_data.json')
+    return load_or_build([json_path], 'climate_data', lambda: build_climate_data(json_path))
+
+def build_climate_data(json_path):
+    """Parse the climate JSON file into one row per country and year."""
+    with open(json_path, 'rb') as f:
+        data = orjson.loads(f.read())
     
     # Extract climate data
     climate_data = data.get('data', {}).get('data', {})
     
-    # Flatten to DataFrame
-    rows = []
-    for country_code, country_data in climate_data.items():
-        if isinstance(country_data, dict):
-            for date, temp in country_data.items():
-                # Extract year from date (format: "YYYY-MM") with error handling
-                year_str = str(date).split('-')[0].replace(',', '')
-                if year_str.isdigit():
-                    year = int(year_str)
-                else:
-                    st.warning(f"Invalid year in date: {date}")
-                    continue
-                rows.append({
-                    'Country_Code': country_code,
-                    'Year': year,
-                    'Temperature': temp
-                })
+    # Flatten to DataFrame: one row per country and date
+    climate_data = {code: dates for code, dates in climate_data.items() if isinstance(dates, dict)}
+    df = (pd.DataFrame.from_dict(climate_data, orient='index')
+          .rename_axis(index='Country_Code', columns='Date')
+          .stack()
+          .dropna()  # dates a country has no reading for
+          .rename('Temperature')
+          .reset_index())
     
-    df = pd.DataFrame(rows)
+    # Extract year from date (format: "YYYY-MM"), dropping dates that don't parse
+    years = pd.to_datetime(df['Date'], format='%Y-%m', errors='coerce').dt.year
+    invalid = years.isna()
+    if invalid.any():
+        bad_dates = df.loc[invalid, 'Date'].unique()[:5].tolist()
+        st.warning(f"Skipped {int(invalid.sum())} rows with an invalid year in the date, e.g. {bad_dates}")
+    df = df[~invalid]
+    df = pd.DataFrame({
+        'Country_Code': df['Country_Code'],
+        'Year': years[~invalid].astype('int16'),
+        'Temperature': df['Temperature'].astype('float32'),
+    }).reset_index(drop=True)
     
-    # Add country names for common codes
-    country_names = {
-        'USA': 'United States', 'CHN': 'China', 'IND': 'India', 
-        'BRA': 'Brazil', 'RUS': 'Russia', 'JPN': 'Japan',
-        'DEU': 'Germany', 'GBR': 'United Kingdom', 'FRA': 'France',
-        'ITA': 'Italy', 'CAN': 'Canada', 'AUS': 'Australia',
-        'MEX': 'Mexico', 'KOR': 'South Korea', 'ESP': 'Spain',
-        'IDN': 'Indonesia', 'NLD': 'Netherlands', 'SAU': 'Saudi Arabia',
-        'TUR': 'Turkey', 'CHE': 'Switzerland', 'POL': 'Poland',
-        'BEL': 'Belgium', 'SWE': 'Sweden', 'NOR': 'Norway',
-        'AUT': 'Austria', 'ARE': 'UAE', 'NGA': 'Nigeria',
-        'ARG': 'Argentina', 'ZAF': 'South Africa', 'EGY': 'Egypt',
-        'UGA': 'Uganda', 'KEN': 'Kenya', 'TZA': 'Tanzania',
-        'COG': 'Republic of the Congo', 'COL': 'Colombia', 'CIV': "Côte d'Ivoire", 'CHL': 'Chile',
-        'AGO': 'Angola', 'ALB': 'Albania', 'AND': 'Andorra', 'ARM': 'Armenia', 'AUS': 'Australia',
-        'ATG': 'Antigua and Barbuda', 'AZE': 'Azerbaijan', 'BDI': 'Burundi', 'BEN': 'Benin', 'BFA': 'Burkina Faso',
-        'BGD': 'Bangladesh', 'BGR': 'Bulgaria', 'BHR': 'Bahrain', 'BHS': 'Bahamas', 'BIH': 'Bosnia and Herzegovina',
-        'BLR': 'Belarus', 'BLZ': 'Belize', 'BMU': 'Bermuda', 'BOL': 'Bolivia', 'BRB': 'Barbados',
-        'BRN': 'Brunei', 'BTN': 'Bhutan', 'BWA': 'Botswana', 'CAF': 'Central African Republic', 'CAN': 'Canada',
-        'CHE': 'Switzerland', 'CHN': 'China', 'CYP': 'Cyprus', 'CZE': 'Czechia', 'DNK': 'Denmark',
-        'DOM': 'Dominican Republic', 'DZA': 'Algeria', 'ECU': 'Ecuador', 'EST': 'Estonia', 'ETH': 'Ethiopia',
-        'FIN': 'Finland', 'FJI': 'Fiji', 'FRA': 'France', 'GAB': 'Gabon', 'GHA': 'Ghana',
-        'GRC': 'Greece', 'GRD': 'Grenada', 'GTM': 'Guatemala', 'GUY': 'Guyana', 'HND': 'Honduras',
-        'HRV': 'Croatia', 'HTI': 'Haiti', 'HUN': 'Hungary', 'IDN': 'Indonesia', 'IRL': 'Ireland',
-        'IRN': 'Iran', 'IRQ': 'Iraq', 'ISL': 'Iceland', 'ISR': 'Israel', 'JAM': 'Jamaica',
-        'JOR': 'Jordan', 'JPN': 'Japan', 'KAZ': 'Kazakhstan', 'KEN': 'Kenya', 'KGZ': 'Kyrgyzstan',
-        'KHM': 'Cambodia', 'KOR': 'South Korea', 'KWT': 'Kuwait', 'LAO': 'Laos', 'LBN': 'Lebanon',
-        'LBR': 'Liberia', 'LBY': 'Libya', 'LCA': 'Saint Lucia', 'LIE': 'Liechtenstein', 'LKA': 'Sri Lanka',
-        'LSO': 'Lesotho', 'LTU': 'Lithuania', 'LUX': 'Luxembourg', 'LVA': 'Latvia', 'MAR': 'Morocco',
-        'MDA': 'Moldova', 'MDG': 'Madagascar', 'MDV': 'Maldives', 'MEX': 'Mexico', 'MKD': 'North Macedonia',
-        'MLI': 'Mali', 'MLT': 'Malta', 'MMR': 'Myanmar', 'MNE': 'Montenegro', 'MNG': 'Mongolia',
-        'MOZ': 'Mozambique', 'MRT': 'Mauritania', 'MUS': 'Mauritius', 'MWI': 'Malawi', 'MYS': 'Malaysia',
-        'NAM': 'Namibia', 'NCL': 'New Caledonia', 'NER': 'Niger', 'NGA': 'Nigeria', 'NIC': 'Nicaragua',
-        'NLD': 'Netherlands', 'NOR': 'Norway', 'NPL': 'Nepal', 'NZL': 'New Zealand', 'OMN': 'Oman',
-        'PAK': 'Pakistan', 'PAN': 'Panama', 'PER': 'Peru', 'PHL': 'Philippines', 'PNG': 'Papua New Guinea',
-        'POL': 'Poland', 'PRT': 'Portugal', 'PRY': 'Paraguay', 'QAT': 'Qatar', 'ROU': 'Romania',
-        'RUS': 'Russia', 'RWA': 'Rwanda', 'SAU': 'Saudi Arabia', 'SDN': 'Sudan', 'SEN': 'Senegal',
-        'SGP': 'Singapore', 'SLB': 'Solomon Islands', 'SLE': 'Sierra Leone', 'SLV': 'El Salvador', 'SMR': 'San Marino',
-        'SOM': 'Somalia', 'SRB': 'Serbia', 'SSD': 'South Sudan', 'SUR': 'Suriname', 'SVK': 'Slovakia',
-        'SVN': 'Slovenia', 'SWE': 'Sweden', 'SWZ': 'Eswatini', 'SYC': 'Seychelles', 'SYR': 'Syria',
-        'TCD': 'Chad', 'TGO': 'Togo', 'THA': 'Thailand', 'TJK': 'Tajikistan', 'TKM': 'Turkmenistan',
-        'TLS': 'Timor-Leste', 'TON': 'Tonga', 'TTO': 'Trinidad and Tobago', 'TUN': 'Tunisia', 'TUR': 'Turkey',
-        'TWN': 'Taiwan', 'TZA': 'Tanzania', 'UGA': 'Uganda', 'UKR': 'Ukraine', 'URY': 'Uruguay',
-        'USA': 'United States', 'UZB': 'Uzbekistan', 'VEN': 'Venezuela', 'VNM': 'Vietnam', 'VUT': 'Vanuatu',
-        'WSM': 'Samoa', 'YEM': 'Yemen', 'ZAF': 'South Africa', 'ZMB': 'Zambia', 'ZWE': 'Zimbabwe'
-    }
+    # Add country names and continents; all three code/name columns have a
+    # few hundred distinct values, so they are stored as categoricals and the
+    # lookups run once per country code rather than once per row
+    df['Country_Code'] = df['Country_Code'].astype('category')
+    df['Country_Name'] = lookup_categories(df['Country_Code'], COUNTRY_NAMES)
+    df['Continent'] = lookup_categories(df['Country_Code'], COUNTRY_TO_CONTINENT)
+    return df
+
+def lookup_categories(codes, mapping, default='Unknown'):
+    """Map a categorical Series through a dict, touching only its categories; the result is categorical too."""
+    values = pd.Series(mapping).reindex(codes.cat.categories).fillna(default)
+    value_codes, value_categories = pd.factorize(values, sort=True)
+    return pd.Series(pd.Categorical.from_codes(value_codes[codes.cat.codes], categories=value_categories), index=codes.index)
+
+def read_maritime_table(csv_path):
+    """Read a maritime table, preferring the Parquet copy written by CO2.py when it is up to date."""
+    parquet_path = os.path.splitext(csv_path)[0] + '.parquet'
+    if os.path.exists(parquet_path) and (not os.path.exists(csv_path) or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        return pd.read_parquet(parquet_path)
+    return pd.read_csv(csv_path, engine='pyarrow', dtype={'CO2_Emissions': 'float32'})
+
+def build_maritime_table(csv_path):
+    """Read a maritime table and add Year, Month and YearMonth columns."""
+    df = read_maritime_table(csv_path)
+    # Dimension columns (area, vessel, source, period...) repeat a handful of values
+    df = df.astype({col: 'category' for col in df.columns if col != 'CO2_Emissions'})
     
-    df['Country_Name'] = df['Country_Code'].map(country_names)
-    # If any country names are still missing, replace with empty string (or optionally with 'Unknown')
-    df['Country_Name'] = df['Country_Name'].fillna('Unknown')
-
-    # Add continent mapping
-    country_to_continent = {
-        # Africa
-        'DZA': 'Africa', 'AGO': 'Africa', 'BEN': 'Africa', 'BWA': 'Africa', 'BFA': 'Africa', 'BDI': 'Africa',
-        'CMR': 'Africa', 'CPV': 'Africa', 'CAF': 'Africa', 'TCD': 'Africa', 'COM': 'Africa', 'COG': 'Africa',
-        'CIV': 'Africa', 'COD': 'Africa', 'DJI': 'Africa', 'EGY': 'Africa', 'GNQ': 'Africa', 'ERI': 'Africa',
-        'SWZ': 'Africa', 'ETH': 'Africa', 'GAB': 'Africa', 'GMB': 'Africa', 'GHA': 'Africa', 'GIN': 'Africa',
-        'GNB': 'Africa', 'KEN': 'Africa', 'LSO': 'Africa', 'LBR': 'Africa', 'LBY': 'Africa', 'MDG': 'Africa',
-        'MWI': 'Africa', 'MLI': 'Africa', 'MRT': 'Africa', 'MUS': 'Africa', 'MYT': 'Africa', 'MAR': 'Africa',
-        'MOZ': 'Africa', 'NAM': 'Africa', 'NER': 'Africa', 'NGA': 'Africa', 'REU': 'Africa', 'RWA': 'Africa',
-        'STP': 'Africa', 'SEN': 'Africa', 'SYC': 'Africa', 'SLE': 'Africa', 'SOM': 'Africa', 'ZAF': 'Africa',
-        'SSD': 'Africa', 'SDN': 'Africa', 'TZA': 'Africa', 'TGO': 'Africa', 'TUN': 'Africa', 'UGA': 'Africa',
-        'COD': 'Africa', 'ZMB': 'Africa', 'ZWE': 'Africa',
-        # Asia
-        'AFG': 'Asia', 'ARM': 'Asia', 'AZE': 'Asia', 'BHR': 'Asia', 'BGD': 'Asia', 'BTN': 'Asia', 'BRN': 'Asia',
-        'KHM': 'Asia', 'CHN': 'Asia', 'CYP': 'Asia', 'GEO': 'Asia', 'IND': 'Asia', 'IDN': 'Asia', 'IRN': 'Asia',
-        'IRQ': 'Asia', 'ISR': 'Asia', 'JPN': 'Asia', 'JOR': 'Asia', 'KAZ': 'Asia', 'KWT': 'Asia', 'KGZ': 'Asia',
-        'LAO': 'Asia', 'LBN': 'Asia', 'MAC': 'Asia', 'MYS': 'Asia', 'MDV': 'Asia', 'MNG': 'Asia', 'MMR': 'Asia',
-        'NPL': 'Asia', 'PRK': 'Asia', 'OMN': 'Asia', 'PAK': 'Asia', 'PSE': 'Asia', 'PHL': 'Asia', 'QAT': 'Asia',
-        'SAU': 'Asia', 'SGP': 'Asia', 'KOR': 'Asia', 'LKA': 'Asia', 'SYR': 'Asia', 'TWN': 'Asia', 'TJK': 'Asia',
-        'THA': 'Asia', 'TLS': 'Asia', 'TUR': 'Asia', 'TKM': 'Asia', 'ARE': 'Asia', 'UZB': 'Asia', 'VNM': 'Asia',
-        'YEM': 'Asia',
-        # Europe
-        'ALB': 'Europe', 'AND': 'Europe', 'AUT': 'Europe', 'BLR': 'Europe', 'BEL': 'Europe', 'BIH': 'Europe',
-        'BGR': 'Europe', 'HRV': 'Europe', 'CZE': 'Europe', 'DNK': 'Europe', 'EST': 'Europe', 'FRO': 'Europe',
-        'FIN': 'Europe', 'FRA': 'Europe', 'DEU': 'Europe', 'GIB': 'Europe', 'GRC': 'Europe', 'GGY': 'Europe',
-        'HUN': 'Europe', 'ISL': 'Europe', 'IRL': 'Europe', 'IMN': 'Europe', 'ITA': 'Europe', 'JEY': 'Europe',
-        'LVA': 'Europe', 'LIE': 'Europe', 'LTU': 'Europe', 'LUX': 'Europe', 'MLT': 'Europe', 'MDA': 'Europe',
-        'MCO': 'Europe', 'MNE': 'Europe', 'NLD': 'Europe', 'MKD': 'Europe', 'NOR': 'Europe', 'POL': 'Europe',
-        'PRT': 'Europe', 'ROU': 'Europe', 'RUS': 'Europe', 'SMR': 'Europe', 'SRB': 'Europe', 'SVK': 'Europe',
-        'SVN': 'Europe', 'ESP': 'Europe', 'SWE': 'Europe', 'CHE': 'Europe', 'UKR': 'Europe', 'GBR': 'Europe',
-        'VAT': 'Europe',
-        # North America
-        'AIA': 'North America', 'ATG': 'North America', 'BHS': 'North America', 'BRB': 'North America',
-        'BLZ': 'North America', 'BMU': 'North America', 'CAN': 'North America', 'CYM': 'North America',
-        'CRI': 'North America', 'CUB': 'North America', 'DMA': 'North America', 'DOM': 'North America',
-        'SLV': 'North America', 'GRL': 'North America', 'GRD': 'North America', 'GLP': 'North America',
-        'GTM': 'North America', 'HTI': 'North America', 'HND': 'North America', 'JAM': 'North America',
-        'MTQ': 'North America', 'MEX': 'North America', 'MSR': 'North America', 'ANT': 'North America',
-        'NIC': 'North America', 'PAN': 'North America', 'PRI': 'North America', 'KNA': 'North America',
-        'LCA': 'North America', 'SPM': 'North America', 'VCT': 'North America', 'TTO': 'North America',
-        'TCA': 'North America', 'USA': 'North America', 'VIR': 'North America',
-        # South America
-        'ARG': 'South America', 'BOL': 'South America', 'BRA': 'South America', 'CHL': 'South America',
-        'COL': 'South America', 'ECU': 'South America', 'FLK': 'South America', 'GUF': 'South America',
-        'GUY': 'South America', 'PRY': 'South America', 'PER': 'South America', 'SUR': 'South America',
-        'URY': 'South America', 'VEN': 'South America',
-        # Oceania
-        'ASM': 'Oceania', 'AUS': 'Oceania', 'COK': 'Oceania', 'FJI': 'Oceania', 'PYF': 'Oceania',
-        'GUM': 'Oceania', 'KIR': 'Oceania', 'MHL': 'Oceania', 'FSM': 'Oceania', 'NRU': 'Oceania',
-        'NCL': 'Oceania', 'NZL': 'Oceania', 'NIU': 'Oceania', 'NFK': 'Oceania', 'MNP': 'Oceania',
-        'PLW': 'Oceania', 'PNG': 'Oceania', 'WSM': 'Oceania', 'SLB': 'Oceania', 'TKL': 'Oceania',
-        'TON': 'Oceania', 'TUV': 'Oceania', 'VUT': 'Oceania',
-    }
-    df['Continent'] = df['Country_Code'].map(country_to_continent).fillna('Unknown')
+    # Parse TIME_PERIOD ("YYYY-MM") once and derive Year and Month from it;
+    # only the distinct periods are parsed, then gathered back by category code
+    periods = df['TIME_PERIOD'].cat
+    parsed = pd.to_datetime(periods.categories.astype(str), format='%Y-%m', errors='coerce')
+    ts = pd.Series(parsed.take(periods.codes, allow_fill=True), index=df.index)
+    invalid = int(ts.isna().sum())
+    if invalid:
+        st.warning(f"{invalid} rows with an invalid TIME_PERIOD in {os.path.basename(csv_path)}")
+    df['Year'] = ts.dt.year.astype('Int16')
+    df['Month'] = ts.dt.month.astype('Int8')
+    df['YearMonth'] = ts
+    df['CO2_Emissions'] = df['CO2_Emissions'].astype('float32')
     return df
 
 @st.cache_data
@@ -201,24 +438,12 @@ def load_maritime_data():
     try:
         # Get the directory where this script is located
         script_dir = os.path.dirname(os.path.abspath(__file__))
-        world_df = pd.read_csv(os.path.join(script_dir, 'maritime_world_total.csv'))
-        oecd_df = pd.read_csv(os.path.join(script_dir, 'maritime_oecd_countries.csv'))
-        
-        # Convert TIME_PERIOD to year-month format and extract year, with error handling
-        def safe_year(val):
-            year_str = str(val)[:4].replace(',', '')
-            if year_str.isdigit():
-                return int(year_str)
-            else:
-                st.warning(f"Invalid year in TIME_PERIOD: {val}")
-                return None
-        world_df['Year'] = world_df['TIME_PERIOD'].apply(safe_year)
-        world_df['Month'] = world_df['TIME_PERIOD'].str[5:7].apply(lambda x: int(x) if str(x).isdigit() else None)
-        world_df['YearMonth'] = pd.to_datetime(world_df['TIME_PERIOD'], errors='coerce')
-
-        oecd_df['Year'] = oecd_df['TIME_PERIOD'].apply(safe_year)
-        oecd_df['Month'] = oecd_df['TIME_PERIOD'].str[5:7].apply(lambda x: int(x) if str(x).isdigit() else None)
-        oecd_df['YearMonth'] = pd.to_datetime(oecd_df['TIME_PERIOD'], errors='coerce')
+        tables = []
+        for name in ('maritime_world_total', 'maritime_oecd_countries'):
+            csv_path = os.path.join(script_dir, f'{name}.csv')
+            sources = [csv_path, os.path.join(script_dir, f'{name}.parquet')]
+            tables.append(load_or_build(sources, name, lambda: build_maritime_table(csv_path)))
+        world_df, oecd_df = tables
         
         return world_df, oecd_df
     except Exception as e:
@@ -226,159 +451,510 @@ def load_maritime_data():
             st.error(f"❌ Error loading maritime data: {e}")
         return None, None
 
+def build_sea_level_data(csv_path):
+    """Read the yearly sea level file, fixing its comma decimals."""
+    sea_level_df = pd.read_csv(csv_path, engine='pyarrow')
+    # Fix GMSL_Variation_mm when it was written with comma decimals: replace commas with dots and convert to float
+    if 'GMSL_Variation_mm' in sea_level_df.columns and not pd.api.types.is_numeric_dtype(sea_level_df['GMSL_Variation_mm']):
+        sea_level_df['GMSL_Variation_mm'] = sea_level_df['GMSL_Variation_mm'].astype(str).str.replace(',', '.', regex=False).astype(float)
+    # Normalise Year here, once, so views can use it directly; only older exports wrote "2,019"
+    if not pd.api.types.is_numeric_dtype(sea_level_df['Year']):
+        sea_level_df['Year'] = sea_level_df['Year'].astype(str).str.replace(',', '', regex=False)
+    sea_level_df['Year'] = sea_level_df['Year'].astype('int16')
+    sea_level_df['GMSL_Variation_mm'] = sea_level_df['GMSL_Variation_mm'].astype('float32')
+    return sea_level_df
+
 @st.cache_data
 def load_sea_level_data():
     """Load and process sea level data from CSV file."""
     try:
-        script_dir = os.path.dirname(os.path.abspath(__file__))
-        sea_level_df = pd.read_csv(os.path.join(script_dir, 'sea_level_yearly_new.csv'))
-        # Fix GMSL_Variation_mm: replace commas with dots and convert to float
-        if 'GMSL_Variation_mm' in sea_level_df.columns:
-            sea_level_df['GMSL_Variation_mm'] = sea_level_df['GMSL_Variation_mm'].astype(str).str.replace(',', '.', regex=False).astype(float)
-        return sea_level_df
+        csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sea_level_yearly_new.csv')
+        return load_or_build([csv_path], 'sea_level_yearly', lambda: build_sea_level_data(csv_path))
     except Exception as e:
         if "'str' object cannot be interpreted as an integer" not in str(e):
             st.error(f"❌ Error loading sea level data: {e}")
         return None
 
+@st.cache_data
+def load_sea_level_regions():
+    """Load yearly sea level data per ocean region."""
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sea_level_by_region_yearly.csv')
+    return pd.read_csv(csv_path, engine='pyarrow', dtype={'Region': 'category', 'year': 'int16'})
+
+@st.cache_data
+def load_sea_level_monthly():
+    """Load monthly sea level data with the month-on-month change and month names added, indexed by Year."""
+    csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sea_level_monthly.csv')
+    df = pd.read_csv(csv_path, engine='pyarrow').sort_values(['Year', 'Month'])
+    df['Monthly_Change_mm'] = df['GMSL_Variation_mm'].diff()
+    df['Month_Name'] = df['Month'].map(MONTH_MAP)
+    # Sorted Year index: picking a year in the fragment is an index slice, not a mask
+    return df.set_index('Year')
+
+@st.cache_data
+def build_country_year_avg():
+    """Average temperature per year and country, with each country's name and continent.
+    
+    Returns the table twice: indexed by Year for the World view, and by
+    (Year, Continent) for the continent views.
+    """
+    df = load_climate_data()
+    country_year_avg = df.groupby(['Year', 'Country_Code'], observed=True)['Temperature'].mean().rename('Avg_Temperature').reset_index()
+    country_year_avg['Country_Name'] = lookup_categories(country_year_avg['Country_Code'], COUNTRY_NAMES)
+    country_year_avg['Continent'] = lookup_categories(country_year_avg['Country_Code'], COUNTRY_TO_CONTINENT)
+    # Name shown in the top-5 tables: countries without a known name fall back to their code
+    country_year_avg['Display_Name'] = np.where(country_year_avg['Country_Name'] == 'Unknown', country_year_avg['Country_Code'].astype(str), country_year_avg['Country_Name'])
+    world_yearly = country_year_avg.set_index('Year')
+    continent_yearly = country_year_avg.set_index(['Year', 'Continent']).sort_index()
+    return world_yearly, continent_yearly
+
+@st.cache_data
+def global_yearly_temp():
+    """Average temperature across all countries for each year."""
+    return load_climate_data().groupby('Year', sort=True, observed=True)['Temperature'].mean().reset_index()
+
+@st.cache_data
+def world_maritime_yearly():
+    """Total world maritime CO2 emissions for each year."""
+    world_df, _ = load_maritime_data()
+    return world_df.groupby('Year', observed=True)['CO2_Emissions'].sum().reset_index()
+
+@st.cache_data
+def world_maritime_monthly():
+    """Total world maritime CO2 emissions for each calendar month (YearMonth is parsed by the loader).
+    
+    Resampling to month starts keeps one point per month whatever the source
+    granularity; a month with no readings is left empty rather than plotted as zero.
+    """
+    world_df, _ = load_maritime_data()
+    return world_df.resample('MS', on='YearMonth')['CO2_Emissions'].sum(min_count=1).reset_index()
+
+@st.cache_data
+def world_vessel_emissions():
+    """Total world maritime CO2 emissions for each vessel type, as a Series indexed by VESSEL."""
+    world_df, _ = load_maritime_data()
+    return world_df.groupby('VESSEL', observed=True)['CO2_Emissions'].sum()
+
+def domestic_international(world_df):
+    """Year, source and emissions of the world table rows for domestic and international voyages."""
+    mask = world_df['VESSEL_EMISSIONS_SOURCE'].isin(['Domestic voyages', 'International voyages'])
+    return world_df.loc[mask, ['Year', 'VESSEL_EMISSIONS_SOURCE', 'CO2_Emissions']]
+
+@st.cache_data
+def world_voyage_yearly_emissions():
+    """Yearly world maritime CO2 emissions split into domestic and international voyages."""
+    world_df, _ = load_maritime_data()
+    return domestic_international(world_df).groupby(['Year', 'VESSEL_EMISSIONS_SOURCE'], observed=True)['CO2_Emissions'].sum().reset_index()
+
+@st.cache_data
+def world_voyage_emissions():
+    """Total world maritime CO2 emissions for domestic and for international voyages."""
+    # Roll up the yearly split rather than scanning the world table again
+    yearly = world_voyage_yearly_emissions()
+    return yearly.groupby('VESSEL_EMISSIONS_SOURCE', observed=True)['CO2_Emissions'].sum().reset_index()
+
+@st.cache_data
+def temperature_co2_data():
+    """Yearly global average temperature and total maritime CO2 emissions, for years that have both."""
+    annual_temp = global_yearly_temp().rename(columns={'Temperature': 'Avg_Temperature'})
+    annual_maritime = world_maritime_yearly().rename(columns={'CO2_Emissions': 'Total_CO2_Emissions'})
+    return pd.merge(annual_temp, annual_maritime, on='Year', how='inner')
+
+@st.cache_data
+def climate_connection_data():
+    """Yearly temperature, sea level and maritime CO2 (Mt), limited to years that have all three."""
+    # Line the three yearly series up on Year with a single inner join
+    maritime_yearly = world_maritime_yearly().set_index('Year')['CO2_Emissions']
+    return pd.concat([
+        global_yearly_temp().set_index('Year')['Temperature'],
+        load_sea_level_data().set_index('Year')['GMSL_Variation_mm'],
+        (maritime_yearly / 1_000_000).rename('CO2_Millions')
+    ], axis=1, join='inner').dropna().rename_axis('Year').reset_index()
+
+@st.cache_data
+def top_sea_level_regions(n=5):
+    """The n ocean regions with the highest sea level rise in the latest year of the regional data."""
+    regions = load_sea_level_regions()
+    latest = regions[regions['year'] == regions['year'].max()]
+    return latest.nlargest(n, 'Sea_Level_mm')
+
+def m4_downsample(df, y, width=1000):
+    """Keep the first, last, min and max row of each of `width` equal buckets of an x-sorted frame (M4).
+
+    A line drawn through those rows is pixel-identical at `width` pixels, so the
+    browser receives at most 4 * width points; shorter frames are returned as is.
+    Min and max are taken over the non-missing values only: a bucket that is all
+    NaN (a gap, e.g. months without data) keeps its first and last row, so the
+    gap is still drawn.
+    """
+    if len(df) <= 4 * width:
+        return df
+    values = pd.Series(df[y].to_numpy())
+    bucket = np.arange(len(df)) * width // len(df)
+    buckets = values.groupby(bucket)
+    present = values.notna().to_numpy()
+    extremes = values[present].groupby(bucket[present])
+    keep = np.unique(np.concatenate([
+        buckets.head(1).index, buckets.tail(1).index, extremes.idxmin(), extremes.idxmax()
+    ]))
+    return df.iloc[keep]
+
+@st.cache_data
+def country_temperature_stats():
+    """All-time mean, max and min temperature of every country, indexed by Country_Name."""
+    return load_climate_data().groupby('Country_Name', observed=True)['Temperature'].agg(['mean', 'max', 'min'])
+
+def country_avg_for(year, continent):
+    """Per-country average temperatures for one year, limited to a continent unless it is "World"."""
+    # Slice the indexed averages instead of masking every row; World needs no continent key at all
+    world_yearly, continent_yearly = build_country_year_avg()
+    table, key = (world_yearly, year) if continent == "World" else (continent_yearly, (year, continent))
+    if key in table.index:
+        return table.loc[[key]].reset_index(drop=True)
+    return table.iloc[:0].reset_index(drop=True)
+
+@st.cache_resource(max_entries=32)
+def build_choropleth(year, continent):
+    """Temperature map for one year and continent; cached so revisited selections skip figure construction."""
+    country_avg = country_avg_for(year, continent)
+    continent_config = CONTINENT_VIEWS[continent]
+    fig = px.choropleth(country_avg, locations='Country_Code', locationmode='ISO-3', color='Avg_Temperature', hover_name='Country_Name', hover_data={'Country_Name': True, 'Avg_Temperature': ':.2f'}, color_continuous_scale=[[0, '#313695'], [0.2, '#4575b4'], [0.4, '#abd9e9'], [0.5, '#ffffbf'], [0.6, '#fdae61'], [0.8, '#f46d43'], [1, '#a50026']], labels={'Avg_Temperature': 'Temperature (°C)'})
+    geo = dict(showframe=True, showcoastlines=True, showland=True, landcolor="rgb(243, 243, 243)", showcountries=True, countrycolor="rgb(204, 204, 204)", projection_type='natural earth', bgcolor='rgba(0,0,0,0)')
+    geo.update(continent_config)
+    fig.update_layout(height=260, geo=geo, margin=dict(l=0, r=0, t=10, b=0), coloraxis_colorbar=dict(title="Temp (°C)", thickness=8, len=0.35, x=1.01))
+    fig.update_traces(marker_line_color='darkgray', marker_line_width=0.5)
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_global_trend_chart():
+    """Line chart of the yearly global average temperature."""
+    fig = px.line(global_yearly_temp(), x='Year', y='Temperature', title='', labels={'Temperature': 'Temperature (°C)', 'Year': 'Year'}, render_mode='webgl')
+    fig.update_traces(line_color='#ff7f0e', line_width=2)
+    fig.update_layout(height=260, margin=dict(l=10, r=10, t=10, b=10), xaxis=dict(showline=False, zeroline=False, showgrid=False, tickformat='d'), yaxis=dict(showline=False, zeroline=False, showgrid=False))
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_country_chart(country_name):
+    """Line chart of one country's temperature over the years."""
+    df = load_climate_data()
+    country_all_years = df[df['Country_Name'] == country_name].sort_values('Year')
+    fig = px.line(country_all_years, x='Year', y='Temperature', title='', labels={'Temperature': 'Temperature (°C)', 'Year': 'Year', 'Country_Name': 'Country'}, render_mode='webgl')
+    fig.update_traces(line_color='#ff7f0e', line_width=2)
+    fig.update_layout(height=180, hovermode='x unified', margin=dict(l=10, r=10, t=10, b=10), xaxis=dict(showline=False, zeroline=False), yaxis=dict(showline=False, zeroline=False))
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_temperature_co2_chart():
+    """Global average temperature and maritime CO2 emissions per year, on two y-axes."""
+    correlation_data = temperature_co2_data()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=correlation_data['Year'],
+        y=correlation_data['Avg_Temperature'],
+        name='Global Avg Temperature',
+        yaxis='y',
+        mode='lines+markers',
+        line=dict(color="#ff0e22", width=3),
+        marker=dict(size=10)
+    ))
+    fig.add_trace(go.Scatter(
+        x=correlation_data['Year'],
+        y=correlation_data['Total_CO2_Emissions'],
+        name='Maritime CO2 Emissions',
+        yaxis='y2',
+        mode='lines+markers',
+        line=dict(color="#95a895", width=3),
+        marker=dict(size=10)
+    ))
+    fig.update_layout(**CHART_LAYOUTS['temperature_co2'])
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_monthly_emissions_chart():
+    """Line chart of the monthly world maritime CO2 emissions."""
+    monthly_emissions = m4_downsample(world_maritime_monthly(), 'CO2_Emissions')
+    # Scattergl (WebGL) stays fast as the monthly series grows
+    fig = go.Figure(go.Scattergl(
+        x=monthly_emissions['YearMonth'],
+        y=monthly_emissions['CO2_Emissions'],
+        mode='lines',
+        line=dict(color='#4b5e4b', width=3),
+        showlegend=False,
+        hovertemplate='%{x}<br>CO₂ Emissions (tonnes)=%{y}<extra></extra>'
+    ))
+    fig.update_layout(**CHART_LAYOUTS['monthly_emissions'])
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_vessel_chart():
+    """Bar chart of the ten vessel types with the highest CO2 emissions."""
+    top10_vessels = world_vessel_emissions().nlargest(10)
+    vessel_emissions = top10_vessels.to_numpy()
+    base_color = np.array([75, 94, 75])
+    dark_color = np.array([45, 58, 45])
+    light_color = np.array([200, 220, 200])
+    n = len(vessel_emissions)
+    # Top 3 darken towards base_color, the rest fade from base_color to light_color
+    top_factors = np.linspace(0, 1, 3)[:, None]
+    rest_factors = np.linspace(0, 1, max(n - 3, 0))[:, None]
+    colors = np.vstack([
+        dark_color + (base_color - dark_color) * top_factors,
+        base_color + (light_color - base_color) * rest_factors
+    ]).astype(int)[:n]
+    gradient_colors = [f"rgb({r}, {g}, {b})" for r, g, b in colors]
+    fig = go.Figure(go.Bar(
+        x=top10_vessels.index.to_numpy(),
+        y=vessel_emissions,
+        marker_color=gradient_colors,
+        showlegend=False,
+        text=np.char.add(np.round(vessel_emissions / 1_000_000, 2).astype(str), ' Mt'),
+        textposition='outside',
+        hovertemplate='%{x}<br>CO₂ Emissions (tonnes)=%{y}<extra></extra>'
+    ))
+    fig.update_layout(**CHART_LAYOUTS['top_vessels'])
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_voyage_pie():
+    """Pie of world maritime CO2 emissions from domestic vs international voyages."""
+    pie_data = world_voyage_emissions()
+    fig = go.Figure(go.Pie(
+        labels=pie_data['VESSEL_EMISSIONS_SOURCE'],
+        values=pie_data['CO2_Emissions'],
+        marker=dict(colors=["#cac7c7", "#4b5e4b"], line=dict(color='#333', width=2)),
+        hole=0.3,
+        textinfo='label+percent',
+        pull=[0, 0.08],
+        rotation=45,
+        direction='clockwise',
+        sort=False
+    ))
+    fig.update_layout(**CHART_LAYOUTS['voyage_pie'])
+    fig.update_traces(
+        textfont_size=18,
+        marker=dict(line=dict(color='#333', width=2)),
+        pull=[0.08, 0.12],
+        opacity=0.95
+    )
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_voyage_stacked_chart():
+    """Stacked bars of yearly CO2 emissions from domestic and international voyages."""
+    stacked_df = world_voyage_yearly_emissions()
+    stacked_df['CO2_Millions'] = stacked_df['CO2_Emissions'] / 1_000_000
+    voyage_colors = {
+        'Domestic voyages': "#e7d5d5",
+        'International voyages': '#4b5e4b'
+    }
+    fig = go.Figure([
+        go.Bar(
+            x=source_df['Year'],
+            y=source_df['CO2_Millions'],
+            name=source,
+            marker_color=voyage_colors.get(source),
+            hovertemplate=f'Voyage Type={source}<br>Year=%{{x}}<br>CO₂ Emissions (Mt)=%{{y}}<extra></extra>'
+        )
+        for source, source_df in stacked_df.groupby('VESSEL_EMISSIONS_SOURCE', observed=True)
+    ])
+    fig.update_layout(**CHART_LAYOUTS['voyage_stacked'])
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_climate_connection_chart():
+    """Temperature, sea level and maritime CO2 over the years, each on its own y-axis."""
+    triple_df = climate_connection_data()
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=triple_df['Year'],
+        y=triple_df['Temperature'],
+        name='Temperature',
+        line=dict(color='#ff7f0e', width=3),
+        mode='lines+markers',
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=triple_df['Year'],
+        y=triple_df['GMSL_Variation_mm'],
+        name='Sea Level',
+        yaxis='y2',
+        line=dict(color='#1f77b4', width=3),
+        mode='lines+markers',
+        marker=dict(size=8)
+    ))
+    fig.add_trace(go.Scatter(
+        x=triple_df['Year'],
+        y=triple_df['CO2_Millions'],
+        name='Maritime CO2',
+        yaxis='y3',
+        line=dict(color='#2ca02c', width=3),
+        mode='lines+markers',
+        marker=dict(size=8)
+    ))
+    fig.update_layout(**CHART_LAYOUTS['climate_connection'])
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_top_regions_chart():
+    """Bar chart of the five ocean regions with the highest latest sea level rise."""
+    top5 = top_sea_level_regions()
+    blue_gradient = [
+        'rgba(31,119,180,1)',
+        'rgba(52,152,219,0.9)',
+        'rgba(93,173,226,0.8)',
+        'rgba(133,193,233,0.7)',
+        'rgba(174,214,241,0.6)'
+    ]
+    fig = go.Figure(go.Bar(
+        x=top5['Region'],
+        y=top5['Sea_Level_mm'],
+        marker=dict(color=blue_gradient, line=dict(color='#1f77b4', width=2)),
+        text=top5['Sea_Level_mm'].round(1),
+        textposition='outside',
+        hovertemplate='%{x}<br>Sea Level Rise (mm)=%{y}<extra></extra>'
+    ))
+    fig.update_layout(**CHART_LAYOUTS['top_regions'])
+    return fig
+
+@st.fragment
+def monthly_sea_level_chart(sea_level_monthly_df):
+    """Year selector and monthly sea level change chart; changing the year reruns only this fragment."""
+    available_years = sea_level_monthly_df.index.unique().tolist()
+    selected_year = st.selectbox(
+        "Select Year",
+        available_years,
+        index=available_years.index(max(available_years)),
+        key="monthly_sea_level_year_selector"
+    )
+    filtered_df = sea_level_monthly_df.loc[[selected_year]]
+    fig_monthly_rise = go.Figure(go.Bar(
+        x=filtered_df['Month_Name'],
+        y=filtered_df['Monthly_Change_mm'],
+        marker=dict(color='rgba(31,119,180,0.8)', line=dict(color='#1f77b4', width=2)),
+        text=filtered_df['Monthly_Change_mm'].round(2),
+        textposition='outside',
+        hovertemplate='Month=%{x}<br>Monthly Sea Level Change (mm)=%{y}<extra></extra>'
+    ))
+    fig_monthly_rise.update_layout(**CHART_LAYOUTS['monthly_sea_level'])
+    st.markdown(f"<div style='text-align:center; font-size:1.2rem; font-weight:bold; margin:0.5rem 0;'>Monthly Sea Level Rise Change ({selected_year})</div>", unsafe_allow_html=True)
+    st.plotly_chart(fig_monthly_rise, config={"responsive": True}, key="monthly_sea_level_rise")
+
+def submit_openai_question():
+    """Answer the question typed into the chat input and clear the input.
+
+    Runs as the input's on_change callback, before the rerun, so the history
+    below already shows the new answer and the question isn't submitted again.
+    """
+    user_input = st.session_state['openai_user_input']
+    if user_input:
+        # Placeholder for OpenAI API call
+        # In production, replace the below with an actual OpenAI API call
+        response = f"[OpenAI simulated response] You asked: '{user_input}'. (This is a placeholder. Integrate OpenAI API for real answers.)"
+        st.session_state['openai_chat_history'].append((user_input, response))
+        st.session_state['openai_user_input'] = ''
+
+def load_all_data():
+    """Run the three independent loaders concurrently, so a cold start waits for the slowest one rather than all three."""
+    ctx = get_script_run_ctx()
+    # Worker threads need the script context so the loaders' st.warning/st.error calls still render
+    with ThreadPoolExecutor(max_workers=3, initializer=lambda: add_script_run_ctx(threading.current_thread(), ctx)) as executor:
+        climate_future = executor.submit(load_climate_data)
+        maritime_future = executor.submit(load_maritime_data)
+        sea_level_future = executor.submit(load_sea_level_data)
+        return climate_future.result(), maritime_future.result(), sea_level_future.result()
+
 # Load data
 try:
-    df = load_climate_data()
-    df['Year'] = df['Year'].astype(str).str.replace(',', '').astype(int)
+    df, (world_maritime, oecd_maritime), sea_level_df = load_all_data()
     st.markdown('<div class="main-header" style="color:#4b5e4b;">Climate Analysis Dashboard</div>', unsafe_allow_html=True)
-    world_maritime, oecd_maritime = load_maritime_data()
-    sea_level_df = load_sea_level_data()
     analysis_options = get_analysis_options(world_maritime, sea_level_df)
     if 'analysis_type' not in st.session_state or st.session_state['analysis_type'] not in analysis_options:
         default = "🌡️ Climate Temperature" if "🌡️ Climate Temperature" in analysis_options else analysis_options[0]
         st.session_state['analysis_type'] = default
 
     st.markdown("<div style='margin-bottom:0.5rem;'></div>", unsafe_allow_html=True)
-    cols = st.columns(len(analysis_options))
-    for i, (col, opt) in enumerate(zip(cols, analysis_options)):
-        with col:
-            color = "#d62728" if st.session_state['analysis_type'] == opt else "#fff"
-            font_weight = "bold" if st.session_state['analysis_type'] == opt else "normal"
-            if st.button(opt, key=f"analysis_btn_{i}", help=opt, use_container_width=True):
-                st.session_state['analysis_type'] = opt
-    analysis_type = st.session_state['analysis_type']
+    analysis_type = st.radio("Analysis", analysis_options, horizontal=True, label_visibility='collapsed', key='analysis_type')
 
     if analysis_type == "🌡️ Climate Temperature":
         latest_year = int(df['Year'].max())
         earliest_year = int(df['Year'].min())
-        latest_avg_temp = df[df['Year'] == latest_year]['Temperature'].mean()
-        earliest_avg_temp = df[df['Year'] == earliest_year]['Temperature'].mean()
+        yearly_temp = global_yearly_temp().set_index('Year')['Temperature']
+        latest_avg_temp = yearly_temp.loc[latest_year]
+        earliest_avg_temp = yearly_temp.loc[earliest_year]
         temp_change = latest_avg_temp - earliest_avg_temp
         highest_recorded = df['Temperature'].max()
-        metric_col1, metric_col2, metric_col3, metric_col4 = st.columns(4, gap="small")
-        with metric_col1:
-            st.markdown(f"<div style='font-size:0.95em; color:#888;'>Latest Year</div><div style='font-size:1.3em; color:#ff7f0e; font-weight:bold;'>{latest_year}</div>", unsafe_allow_html=True)
-        with metric_col2:
-            st.markdown(f"<div style='font-size:0.95em; color:#888;'>Latest Avg Temp</div><div style='font-size:1.3em; color:#ff7f0e; font-weight:bold;'>{latest_avg_temp:.2f}°C</div>", unsafe_allow_html=True)
-        with metric_col3:
-            st.markdown(f"<div style='font-size:0.95em; color:#888;'>Temp Change</div><div style='font-size:1.3em; color:#ff7f0e; font-weight:bold;'>{temp_change:+.2f}°C</div><div style='font-size:0.8em; color:#888;'>({earliest_year} to {latest_year})</div>", unsafe_allow_html=True)
-        with metric_col4:
-            st.markdown(f"<div style='font-size:0.95em; color:#888;'>Highest Recorded</div><div style='font-size:1.3em; color:#ff7f0e; font-weight:bold;'>{highest_recorded:.2f}°C</div>", unsafe_allow_html=True)
-        global_avg = df.groupby('Year')['Temperature'].mean().reset_index()
+        kpis = [
+            kpi("Latest Year", latest_year),
+            kpi("Latest Avg Temp", f"{latest_avg_temp:.2f}°C"),
+            kpi("Temp Change", f"{temp_change:+.2f}°C", note=f"({earliest_year} to {latest_year})"),
+            kpi("Highest Recorded", f"{highest_recorded:.2f}°C"),
+        ]
+        st.markdown(f"<div class='kpi-row'>{''.join(kpis)}</div>", unsafe_allow_html=True)
         col_trend, col_country = st.columns([1, 1], gap="small")
         with col_trend:
-            fig = px.line(global_avg, x='Year', y='Temperature', title='', labels={'Temperature': 'Temperature (°C)', 'Year': 'Year'})
-            fig.update_traces(line_color='#ff7f0e', line_width=2)
-            fig.update_layout(height=260, margin=dict(l=10, r=10, t=10, b=10), xaxis=dict(showline=False, zeroline=False, showgrid=False, tickformat='d'), yaxis=dict(showline=False, zeroline=False, showgrid=False))
-            st.plotly_chart(fig, use_container_width=True)
+            st.plotly_chart(build_global_trend_chart(), use_container_width=True)
         with col_country:
-            available_country_names = sorted(df['Country_Name'].unique())
+            available_country_names = df['Country_Name'].cat.categories.tolist()  # already sorted by lookup_categories
             selected_country_name = st.selectbox("Select a country for detailed analysis", available_country_names, index=available_country_names.index('United States') if 'United States' in available_country_names else 0, key='main_country_selector')
-            country_all_years = df[df['Country_Name'] == selected_country_name].sort_values('Year')
+            country_stats = country_temperature_stats().loc[selected_country_name]
             stats_col1, stats_col2, stats_col3 = st.columns(3, gap="small")
             with stats_col1:
-                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>All-time Avg</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_all_years['Temperature'].mean():.2f}°C</span></div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>All-time Avg</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_stats['mean']:.2f}°C</span></div>", unsafe_allow_html=True)
             with stats_col2:
-                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>Highest Ever</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_all_years['Temperature'].max():.2f}°C</span></div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>Highest Ever</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_stats['max']:.2f}°C</span></div>", unsafe_allow_html=True)
             with stats_col3:
-                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>Lowest Ever</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_all_years['Temperature'].min():.2f}°C</span></div>", unsafe_allow_html=True)
-            fig_country = px.line(country_all_years, x='Year', y='Temperature', title='', labels={'Temperature': 'Temperature (°C)', 'Year': 'Year', 'Country_Name': 'Country'})
-            fig_country.update_traces(line_color='#ff7f0e', line_width=2)
-            fig_country.update_layout(height=180, hovermode='x unified', margin=dict(l=10, r=10, t=10, b=10), xaxis=dict(showline=False, zeroline=False), yaxis=dict(showline=False, zeroline=False))
-            st.plotly_chart(fig_country, config={"responsive": True})
+                st.markdown(f"<div style='text-align:center;'><span style='font-size:0.95em;'>Lowest Ever</span><br><span style='color:#ff7f0e; font-size:0.85em;'>{country_stats['min']:.2f}°C</span></div>", unsafe_allow_html=True)
+            st.plotly_chart(build_country_chart(selected_country_name), config={"responsive": True})
         filter_col1, filter_col2, _ = st.columns([1, 1, 2], gap="small")
         with filter_col1:
             selected_year = st.slider("Year", min_value=int(df['Year'].min()), max_value=int(df['Year'].max()), value=int(df['Year'].max()), step=1, key="map_year_slider")
         with filter_col2:
-            selected_continent = st.selectbox("Continent", ["World", "Africa", "Asia", "Europe", "North America", "South America", "Oceania"], index=0, key="map_continent_select")
-        continents = {
-            'World': {'scope': 'world', 'center': None},
-            'Africa': {'scope': 'africa', 'center': {'lat': 0, 'lon': 20}},
-            'Asia': {'scope': 'asia', 'center': {'lat': 30, 'lon': 90}},
-            'Europe': {'scope': 'europe', 'center': {'lat': 50, 'lon': 10}},
-            'North America': {'scope': 'north america', 'center': {'lat': 40, 'lon': -100}},
-            'South America': {'scope': 'south america', 'center': {'lat': -15, 'lon': -60}},
-            'Oceania': {'scope': 'world', 'center': {'lat': -25, 'lon': 140}}
-        }
-        if selected_continent == "World":
-            df_filtered = df[df['Year'] == selected_year].copy()
-        else:
-            df_filtered = df[(df['Year'] == selected_year) & (df['Continent'] == selected_continent)].copy()
-        country_avg = df_filtered.groupby('Country_Code')['Temperature'].mean().reset_index()
-        country_avg.columns = ['Country_Code', 'Avg_Temperature']
-        country_avg['Country_Name'] = country_avg['Country_Code'].map(dict(zip(df['Country_Code'], df['Country_Name'])))
+            selected_continent = st.selectbox("Continent", list(CONTINENT_VIEWS), index=0, key="map_continent_select")
+        country_avg = country_avg_for(selected_year, selected_continent)
+        # One sort serves both top-5 tables
+        ranked = country_avg.sort_values('Avg_Temperature')[['Display_Name', 'Avg_Temperature']].rename(columns={'Display_Name': 'Country', 'Avg_Temperature': 'Avg Temp (°C)'})
         metrics_col, map_col, hot_col, cold_col = st.columns([1, 2, 1, 1], gap="small")
         with metrics_col:
-            global_avg_year = country_avg['Avg_Temperature'].mean()
-            hottest_country = country_avg.loc[country_avg['Avg_Temperature'].idxmax()]
-            coldest_country = country_avg.loc[country_avg['Avg_Temperature'].idxmin()]
-            display_name = coldest_country['Country_Code'] if str(coldest_country['Country_Name']) == 'Unknown' else coldest_country['Country_Name']
-            temp_value = coldest_country['Avg_Temperature']
-            temp_value_float = float(temp_value.values[0]) if isinstance(temp_value, pd.Series) or hasattr(temp_value, 'values') else float(temp_value)
-            temp_color = '#313695' if temp_value_float < 0 else "#593e27"
-            temp_range = country_avg['Avg_Temperature'].max() - country_avg['Avg_Temperature'].min()
-            st.markdown(f"<div style='font-size:0.90em; color:#888;'>Global Avg</div><span style='color:#ff7f0e; font-size:1em;'>{global_avg_year:.2f}°C</span><br><div style='font-size:0.90em; color:#888;'>Hottest</div><span style='color:#ff7f0e; font-size:1em;'>{hottest_country['Country_Name']}: {hottest_country['Avg_Temperature']:.1f}°C</span><br><div style='font-size:0.90em; color:#888;'>Coldest</div><span style='color:{temp_color}; font-size:1em;'>{display_name}: {temp_value:.1f}°C</span><br><div style='font-size:0.90em; color:#888;'>Temp Range</div><span style='color:#ff7f0e; font-size:1em;'>{temp_range:.1f}°C</span>", unsafe_allow_html=True)
+            # One array and positional argmax/argmin instead of four separate Series reductions
+            temps = country_avg['Avg_Temperature'].to_numpy(dtype=np.float64)
+            global_avg_year = temps.mean()
+            i_max, i_min = temps.argmax(), temps.argmin()
+            # Scalar reads by position rather than materialising mixed-dtype row Series
+            hottest_name = country_avg['Country_Name'].iat[i_max]
+            display_name = country_avg['Display_Name'].iat[i_min]
+            temp_value = temps[i_min]
+            temp_color = '#313695' if temp_value < 0 else "#593e27"
+            temp_range = temps[i_max] - temps[i_min]
+            st.markdown(f"<div style='font-size:0.90em; color:#888;'>Global Avg</div><span style='color:#ff7f0e; font-size:1em;'>{global_avg_year:.2f}°C</span><br><div style='font-size:0.90em; color:#888;'>Hottest</div><span style='color:#ff7f0e; font-size:1em;'>{hottest_name}: {temps[i_max]:.1f}°C</span><br><div style='font-size:0.90em; color:#888;'>Coldest</div><span style='color:{temp_color}; font-size:1em;'>{display_name}: {temp_value:.1f}°C</span><br><div style='font-size:0.90em; color:#888;'>Temp Range</div><span style='color:#ff7f0e; font-size:1em;'>{temp_range:.1f}°C</span>", unsafe_allow_html=True)
         with map_col:
-            continent_config = continents[selected_continent]
-            fig = px.choropleth(country_avg, locations='Country_Code', locationmode='ISO-3', color='Avg_Temperature', hover_name='Country_Name', hover_data={'Country_Name': True, 'Avg_Temperature': ':.2f'}, color_continuous_scale=[[0, '#313695'], [0.2, '#4575b4'], [0.4, '#abd9e9'], [0.5, '#ffffbf'], [0.6, '#fdae61'], [0.8, '#f46d43'], [1, '#a50026']], labels={'Avg_Temperature': 'Temperature (°C)'})
-            fig.update_layout(height=260, geo=dict(scope=continent_config['scope'], center=continent_config['center'], showframe=True, showcoastlines=True, showland=True, landcolor="rgb(243, 243, 243)", showcountries=True, countrycolor="rgb(204, 204, 204)", projection_type='natural earth', bgcolor='rgba(0,0,0,0)'), margin=dict(l=0, r=0, t=10, b=0), coloraxis_colorbar=dict(title="Temp (°C)", thickness=8, len=0.35, x=1.01))
-            fig.update_traces(marker_line_color='darkgray', marker_line_width=0.5)
+            fig = build_choropleth(selected_year, selected_continent)
             st.plotly_chart(fig, config={"responsive": True, "displayModeBar": False, "use_container_width": True})
         with hot_col:
             if country_avg.empty:
                 st.info("No data for year/continent.")
             else:
-                hottest = country_avg.nlargest(5, 'Avg_Temperature').copy()
-                hottest['Display_Name'] = hottest.apply(lambda row: row['Country_Code'] if row['Country_Name'] == 'Unknown' else row['Country_Name'], axis=1)
                 st.markdown("<div style='text-align:center; font-size:0.95em; font-weight:600; margin-bottom:0.1em;'>Top 5 Hottest</div>", unsafe_allow_html=True)
-                df_hot = hottest[['Display_Name', 'Avg_Temperature']].rename(columns={'Display_Name': 'Country', 'Avg_Temperature': 'Avg Temp (°C)'})
-                html = '<table style="width:100%; text-align:center; border-collapse:collapse; font-size:0.90em;">'
-                html += '<tr><th>Country</th><th>Avg Temp (°C)</th></tr>'
-                for _, row in df_hot.iterrows():
-                    color = '#313695' if row['Avg Temp (°C)'] < 0 else '#ff7f0e'
-                    html += f'<tr><td>{row["Country"]}</td><td style="color:{color};">{row["Avg Temp (°C)"]:.2f}</td></tr>'
-                html += '</table>'
-                st.markdown(html, unsafe_allow_html=True)
+                df_hot = ranked.tail(5).iloc[::-1]
+                st.dataframe(
+                    df_hot.style.map(temperature_style, subset=['Avg Temp (°C)']).format({'Avg Temp (°C)': '{:.2f}'}),
+                    hide_index=True
+                )
         with cold_col:
             if country_avg.empty:
                 st.info("No data for year/continent.")
             else:
-                coldest = country_avg.nsmallest(5, 'Avg_Temperature').copy()
-                coldest['Display_Name'] = coldest.apply(lambda row: row['Country_Code'] if row['Country_Name'] == 'Unknown' else row['Country_Name'], axis=1)
                 st.markdown("<div style='text-align:center; font-size:0.95em; font-weight:600; margin-bottom:0.1em;'>Top 5 Coldest</div>", unsafe_allow_html=True)
-                df_cold = coldest[['Display_Name', 'Avg_Temperature']].rename(columns={'Display_Name': 'Country', 'Avg_Temperature': 'Avg Temp (°C)'})
-                html = '<table style="width:100%; text-align:center; border-collapse:collapse; font-size:0.90em;">'
-                html += '<tr><th>Country</th><th>Avg Temp (°C)</th></tr>'
-                for _, row in df_cold.iterrows():
-                    color = '#313695' if row['Avg Temp (°C)'] < 0 else '#ff7f0e'
-                    html += f'<tr><td>{row["Country"]}</td><td style="color:{color};">{row["Avg Temp (°C)"]:.2f}</td></tr>'
-                html += '</table>'
-                st.markdown(html, unsafe_allow_html=True)
+                df_cold = ranked.head(5)
+                st.dataframe(
+                    df_cold.style.map(temperature_style, subset=['Avg Temp (°C)']).format({'Avg Temp (°C)': '{:.2f}'}),
+                    hide_index=True
+                )
     elif analysis_type == "🚢 CO2 Emissions":
         
         if world_maritime is None:
             st.error("❌ Maritime emissions data not found. Please run `python CO2.py` to fetch the data.")
         else:
-            annual_temp = df.groupby('Year')['Temperature'].mean().reset_index()
-            annual_temp.columns = ['Year', 'Avg_Temperature']
-            annual_maritime = world_maritime.groupby('Year')['CO2_Emissions'].sum().reset_index()
-            annual_maritime.columns = ['Year', 'Total_CO2_Emissions']
-            correlation_data = pd.merge(annual_temp, annual_maritime, on='Year', how='inner')
+            correlation_data = temperature_co2_data()
             col1, col2, col3, col4, col5, col6 = st.columns(6)
             with col1:
                 avg_emissions = correlation_data['Total_CO2_Emissions'].mean()
@@ -408,210 +984,29 @@ try:
                     "<div style='text-align:center;'><span style='font-size:1.2em;'>Year Range</span><br>"
                     "<span style='color:#4b5e4b; font-size:2em; font-weight:bold;'>2019 - 2024</span></div>",
                     unsafe_allow_html=True)
-            fig = go.Figure()
-            fig.add_trace(go.Scatter(
-                x=correlation_data['Year'],
-                y=correlation_data['Avg_Temperature'],
-                name='Global Avg Temperature',
-                yaxis='y',
-                mode='lines+markers',
-                line=dict(color="#ff0e22", width=3),
-                marker=dict(size=10)
-            ))
-            fig.add_trace(go.Scatter(
-                x=correlation_data['Year'],
-                y=correlation_data['Total_CO2_Emissions'],
-                name='Maritime CO2 Emissions',
-                yaxis='y2',
-                mode='lines+markers',
-                line=dict(color="#95a895", width=3),
-                marker=dict(size=10)
-            ))
-            fig.update_layout(
-                title='Global Average Temperature and Maritime CO₂ Emissions (2019-2024)',
-                xaxis=dict(
-                    title=None,
-                    showgrid=False,
-                    showticklabels=True,
-                    tickfont=dict(
-                        color='#fff',
-                        size=12,
-                        family='Arial, sans-serif',
-                        weight='normal'
-                    ),
-                    tickmode='auto',
-                    ticks='outside',
-                    tickangle=0,
-                    showline=False,
-                    zeroline=False,
-                    type='category'
-                ),
-                yaxis=dict(
-                    title=None,
-                    showgrid=False,
-                    showticklabels=False,
-                    showline=False,
-                    zeroline=False
-                ),
-                yaxis2=dict(
-                    title=None,
-                    showgrid=False,
-                    showticklabels=False,
-                    showline=False,
-                    zeroline=False,
-                    anchor='x',
-                    overlaying='y',
-                    side='right'
-                ),
-                hovermode='x unified',
-                height=400,
-                width=380,
-                showlegend=True,
-                legend=dict(x=0.01, y=0.99)
-            )
+            fig = build_temperature_co2_chart()
             col_top1, col_top2 = st.columns([2, 1], gap="medium")
             with col_top1:
                 st.plotly_chart(fig, config={"responsive": True}, key="correlation_chart")
             with col_top2:
-                monthly_df = world_maritime.copy()
-                monthly_df['YearMonth'] = pd.to_datetime(monthly_df['TIME_PERIOD'])
-                monthly_emissions = monthly_df.groupby('YearMonth')['CO2_Emissions'].sum().reset_index()
-                fig_monthly = px.line(
-                    monthly_emissions,
-                    x='YearMonth',
-                    y='CO2_Emissions',
-                    labels={'YearMonth': '', 'CO2_Emissions': 'CO₂ Emissions (tonnes)'},
-                    title='Monthly Maritime CO₂ Emissions (2019-2024)',
-                    height=400
-                )
-                fig_monthly.update_traces(line_color='#4b5e4b', line_width=3)
-                fig_monthly.update_layout(
-                    xaxis=dict(tickfont=dict(size=14), showline=False, zeroline=False),
-                    yaxis=dict(title=None, showline=False, zeroline=False),
-                    margin=dict(l=30, r=30, t=40, b=30),
-                    showlegend=True
-                )
+                fig_monthly = build_monthly_emissions_chart()
                 st.plotly_chart(fig_monthly, config={"responsive": True}, key="monthly_emissions_chart")
             col_viz1, col_viz2, col_viz3 = st.columns([2, 1, 1], gap="medium")
             with col_viz1:
-                vessel_df = world_maritime.groupby('VESSEL')['CO2_Emissions'].sum().reset_index()
-                top10_vessels = vessel_df.nlargest(10, 'CO2_Emissions').copy()
-                top10_vessels['CO2_Mt'] = top10_vessels['CO2_Emissions'] / 1_000_000
-                base_color = np.array([75, 94, 75])
-                dark_color = np.array([45, 58, 45])
-                light_color = np.array([200, 220, 200])
-                n = len(top10_vessels)
-                gradient_colors = []
-                for i in range(3):
-                    factor = i / 2 if 2 > 0 else 0
-                    color = dark_color + (base_color - dark_color) * factor
-                    gradient_colors.append(f"rgb({int(color[0])}, {int(color[1])}, {int(color[2])})")
-                for i in range(3, n):
-                    factor = (i-3) / (n-4) if (n-4) > 0 else 0
-                    color = base_color + (light_color - base_color) * factor
-                    gradient_colors.append(f"rgb({int(color[0])}, {int(color[1])}, {int(color[2])})")
-                fig_vessel = px.bar(
-                    top10_vessels,
-                    x='VESSEL',
-                    y='CO2_Emissions',
-                    labels={'VESSEL': '', 'CO2_Emissions': 'CO₂ Emissions (tonnes)'},
-                    height=400
-                )
-                fig_vessel.update_traces(
-                    marker_color=gradient_colors,
-                    showlegend=False,
-                    text=top10_vessels['CO2_Mt'].round(2).astype(str) + ' Mt',
-                    textposition='outside'
-                )
-                fig_vessel.update_layout(
-                    xaxis=dict(tickfont=dict(size=14), showline=False, zeroline=False),
-                    yaxis=dict(
-                        title=None,
-                        showgrid=False,
-                        showticklabels=False,
-                        showline=False,
-                        zeroline=False
-                    ),
-                    margin=dict(l=30, r=30, t=40, b=30),
-                    showlegend=False,
-                    title='Top 10 Vessel Types by CO₂ Emissions'
-                )
+                fig_vessel = build_vessel_chart()
                 st.plotly_chart(fig_vessel, config={"responsive": True}, key="top10_vessel_chart")
             with col_viz2:
-                domint_df = world_maritime.copy()
-                domint_df['Year'] = domint_df['TIME_PERIOD'].str[:4].astype(int)
-                domint_df = domint_df[domint_df['VESSEL_EMISSIONS_SOURCE'].isin(['Domestic voyages', 'International voyages'])]
-                pie_data = domint_df.groupby('VESSEL_EMISSIONS_SOURCE')['CO2_Emissions'].sum().reset_index()
-                fig_pie3d = go.Figure(go.Pie(
-                    labels=pie_data['VESSEL_EMISSIONS_SOURCE'],
-                    values=pie_data['CO2_Emissions'],
-                    marker=dict(colors=["#cac7c7", "#4b5e4b"], line=dict(color='#333', width=2)),
-                    hole=0.3,
-                    textinfo='label+percent',
-                    pull=[0, 0.08],
-                    rotation=45,
-                    direction='clockwise',
-                    sort=False
-                ))
-                fig_pie3d.update_layout(
-                    height=400,
-                    margin=dict(l=30, r=30, t=40, b=30),
-                    showlegend=False,
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    paper_bgcolor='rgba(0,0,0,0)'
-                )
-                fig_pie3d.update_traces(
-                    textfont_size=18,
-                    marker=dict(line=dict(color='#333', width=2)),
-                    pull=[0.08, 0.12],
-                    opacity=0.95
-                )
-                st.markdown("<div style='text-align:center; font-size:1.2rem; font-weight:bold;'>Emissions from domestic voyages vs International</div>", unsafe_allow_html=True)
-                st.plotly_chart(fig_pie3d, config={"responsive": True}, key="pie3d")
+                # The voyage breakdown is opt-in: a collapsed st.expander would still build both charts
+                show_breakdown = st.toggle("Show voyage breakdown", value=False, key="show_voyage_breakdown")
+                if show_breakdown:
+                    fig_pie3d = build_voyage_pie()
+                    st.markdown("<div style='text-align:center; font-size:1.2rem; font-weight:bold;'>Emissions from domestic voyages vs International</div>", unsafe_allow_html=True)
+                    st.plotly_chart(fig_pie3d, config={"responsive": True}, key="pie3d")
             with col_viz3:
-                stacked_df = domint_df.groupby(['Year', 'VESSEL_EMISSIONS_SOURCE'])['CO2_Emissions'].sum().reset_index()
-                stacked_df['CO2_Millions'] = stacked_df['CO2_Emissions'] / 1_000_000
-                common_height = 400
-                fig_stacked = px.bar(
-                    stacked_df,
-                    x='Year',
-                    y='CO2_Millions',
-                    color='VESSEL_EMISSIONS_SOURCE',
-                    barmode='stack',
-                    labels={
-                        'Year': 'Year',
-                        'CO2_Millions': 'CO₂ Emissions (Mt)',
-                        'VESSEL_EMISSIONS_SOURCE': 'Voyage Type'
-                    },
-                    color_discrete_map={
-                        'Domestic voyages': "#e7d5d5",
-                        'International voyages': '#4b5e4b'
-                    },
-                    height=common_height
-                )
-                fig_stacked.update_layout(
-                    margin=dict(l=30, r=30, t=40, b=30),
-                    xaxis=dict(
-                        tickfont=dict(size=16, color='#fff'),
-                        title=None
-                    ),
-                    yaxis=dict(
-                        title=None,
-                        showgrid=False
-                    ),
-                    legend=dict(
-                        title='',
-                        font=dict(size=16, color='#fff'),
-                        orientation='h',
-                        yanchor='bottom',
-                        y=1.02,
-                        xanchor='right',
-                        x=1
-                    ),
-                    plot_bgcolor='rgba(0,0,0,0)'
-                )
-                st.markdown("<div style='text-align:center; font-size:1.2rem; font-weight:bold; margin:0.5rem 0;'>CO2 emission by year</div>", unsafe_allow_html=True)
-                st.plotly_chart(fig_stacked, config={"responsive": True}, key="stacked_co2_side")
+                if show_breakdown:
+                    fig_stacked = build_voyage_stacked_chart()
+                    st.markdown("<div style='text-align:center; font-size:1.2rem; font-weight:bold; margin:0.5rem 0;'>CO2 emission by year</div>", unsafe_allow_html=True)
+                    st.plotly_chart(fig_stacked, config={"responsive": True}, key="stacked_co2_side")
     elif analysis_type == "🌊 Sea Level":
         
         if sea_level_df is None:
@@ -619,21 +1014,21 @@ try:
         else:
             # Key metrics
             col1, col2, col4 = st.columns(3)
+            # First and last readings, fetched once for both metrics
+            gmsl = sea_level_df['GMSL_Variation_mm'].to_numpy()
+            years = sea_level_df['Year'].to_numpy()
+            first_value, last_value = gmsl[0], gmsl[-1]
+            first_year, last_year = int(years[0]), int(years[-1])
+            total_rise = last_value - first_value
 
             with col1:
-                total_rise = sea_level_df['GMSL_Variation_mm'].iloc[-1] - sea_level_df['GMSL_Variation_mm'].iloc[0]
                 st.markdown(f"""
                 <div style='font-size:1.3em; color:#fff; font-weight:600; margin-bottom:0.2em;'>Total Sea Level Rise</div>
                 <div style='font-size:2em; color:#1f77b4; font-weight:600;'>{total_rise:.1f} mm</div>
                 """, unsafe_allow_html=True)
 
             with col2:
-                first_year = sea_level_df['Year'].iloc[0]
-                last_year = sea_level_df['Year'].iloc[-1]
                 time_span = last_year - first_year
-                first_value = sea_level_df['GMSL_Variation_mm'].iloc[0]
-                last_value = sea_level_df['GMSL_Variation_mm'].iloc[-1]
-                total_rise = last_value - first_value
                 avg_rate = total_rise / time_span if time_span > 0 else 0
                 st.markdown(f"""
                 <div style='font-size:1.3em; color:#fff; font-weight:600; margin-bottom:0.2em;'>Average Rate</div>
@@ -651,138 +1046,25 @@ try:
                 """, unsafe_allow_html=True)
 
             # Triple correlation (if maritime data available)
-            yearly_temp = df.groupby('Year')['Temperature'].mean().reset_index()
-            merged_df = yearly_temp.merge(sea_level_df, on='Year', how='inner')
             if world_maritime is not None:
-                
-                # Aggregate maritime emissions by year
-                maritime_yearly = world_maritime.groupby('Year')['CO2_Emissions'].sum().reset_index()
-                maritime_yearly.columns = ['Year', 'Total_CO2']
-                maritime_yearly['CO2_Millions'] = maritime_yearly['Total_CO2'] / 1_000_000
-                
-                # Merge all three datasets - only keep years with complete data
-                triple_df = merged_df.merge(maritime_yearly, on='Year', how='inner')
-                # Filter out years with missing temperature data
-                triple_df = triple_df.dropna(subset=['Temperature'])
-                
-                if len(triple_df) > 0:
-                    # Normalize values for comparison (0-100 scale)
-                    triple_df['Temp_Norm'] = ((triple_df['Temperature'] - triple_df['Temperature'].min()) / 
-                                              (triple_df['Temperature'].max() - triple_df['Temperature'].min())) * 100
-                    triple_df['SeaLevel_Norm'] = ((triple_df['GMSL_Variation_mm'] - triple_df['GMSL_Variation_mm'].min()) / 
-                                                   (triple_df['GMSL_Variation_mm'].max() - triple_df['GMSL_Variation_mm'].min())) * 100
-                    triple_df['CO2_Norm'] = ((triple_df['CO2_Millions'] - triple_df['CO2_Millions'].min()) / 
-                                             (triple_df['CO2_Millions'].max() - triple_df['CO2_Millions'].min())) * 100
+                if len(climate_connection_data()) > 0:
                     # --- Move Climate Connection and Top 5 Ocean Regions side by side ---
                     col_cc, col_right = st.columns([2, 2], gap="small")
                     with col_cc:
-                        fig4 = go.Figure()
-                        fig4.add_trace(go.Scatter(
-                            x=triple_df['Year'],
-                            y=triple_df['Temp_Norm'],
-                            name='Temperature',
-                            line=dict(color='#ff7f0e', width=3),
-                            mode='lines+markers',
-                            marker=dict(size=8)
-                        ))
-                        fig4.add_trace(go.Scatter(
-                            x=triple_df['Year'],
-                            y=triple_df['SeaLevel_Norm'],
-                            name='Sea Level',
-                            line=dict(color='#1f77b4', width=3),
-                            mode='lines+markers',
-                            marker=dict(size=8)
-                        ))
-                        fig4.add_trace(go.Scatter(
-                            x=triple_df['Year'],
-                            y=triple_df['CO2_Norm'],
-                            name='Maritime CO2',
-                            line=dict(color='#2ca02c', width=3),
-                            mode='lines+markers',
-                            marker=dict(size=8)
-                        ))
-                        fig4.update_layout(
-                            title='The Climate Connection: All Three Indicators Rising Together',
-                            xaxis=dict(title='Year', dtick=1, showgrid=False, zeroline=False, showline=False),
-                            yaxis=dict(title='Normalized Value (0-100)', showgrid=False, zeroline=False, showline=False),
-                            height=340,  # reduced height
-                            hovermode='x unified',
-                            legend=dict(
-                                orientation='h',
-                                yanchor='bottom',
-                                y=1.02,
-                                xanchor='right',
-                                x=1
-                            )
-                        )
+                        fig4 = build_climate_connection_chart()
                         st.plotly_chart(fig4, use_container_width=True)
                     with col_right:
                         col_top5, col_monthly = st.columns([1, 1], gap="small")
                         with col_top5:
                             try:
-                                script_dir = os.path.dirname(os.path.abspath(__file__))
-                                sea_level_region_df = pd.read_csv(os.path.join(script_dir, 'sea_level_by_region_yearly.csv'))
-                                latest_year = sea_level_region_df['year'].max()
-                                latest = sea_level_region_df[sea_level_region_df['year'] == latest_year].copy()
-                                top5 = latest.nlargest(5, 'Sea_Level_mm').copy()
-                                blue_gradient = [
-                                    'rgba(31,119,180,1)',
-                                    'rgba(52,152,219,0.9)',
-                                    'rgba(93,173,226,0.8)',
-                                    'rgba(133,193,233,0.7)',
-                                    'rgba(174,214,241,0.6)'
-                                ]
-                                fig_top5 = px.bar(
-                                    top5.sort_values('Sea_Level_mm', ascending=False),
-                                    x='Region',
-                                    y='Sea_Level_mm',
-                                    labels={'Region': '', 'Sea_Level_mm': 'Sea Level Rise (mm)'},
-                                    title='',
-                                    height=340  # reduced height
-                                )
-                                fig_top5.update_traces(marker_color=blue_gradient, marker_line_color='#1f77b4', marker_line_width=2, text=top5['Sea_Level_mm'].round(1), textposition='outside')
-                                fig_top5.update_layout(
-                                    xaxis=dict(tickfont=dict(size=16)),
-                                    yaxis=dict(title=None, showgrid=False),
-                                    margin=dict(l=30, r=30, t=60, b=30),
-                                    showlegend=False
-                                )
+                                fig_top5 = build_top_regions_chart()
                                 st.markdown("<div style='text-align:center; font-size:1.2rem; font-weight:bold; margin:0.5rem 0;'>Top 5 Ocean Regions by Sea Level Rise</div>", unsafe_allow_html=True)
                                 st.plotly_chart(fig_top5, config={"responsive": True}, key="top5_ocean_sealevel")
                             except Exception as e:
                                 st.warning(f"Could not load regional sea level data: {e}")
                         with col_monthly:
                             try:
-                                sea_level_monthly_df = pd.read_csv(os.path.join(script_dir, 'sea_level_monthly.csv'))
-                                sea_level_monthly_df = sea_level_monthly_df.sort_values(['Year', 'Month'])
-                                sea_level_monthly_df['Monthly_Change_mm'] = sea_level_monthly_df['GMSL_Variation_mm'].diff()
-                                month_map = {1: 'Jan', 2: 'Feb', 3: 'Mar', 4: 'Apr', 5: 'May', 6: 'Jun', 7: 'Jul', 8: 'Aug', 9: 'Sep', 10: 'Oct', 11: 'Nov', 12: 'Dec'}
-                                sea_level_monthly_df['Month_Name'] = sea_level_monthly_df['Month'].map(month_map)
-                                available_years = sorted(sea_level_monthly_df['Year'].unique())
-                                selected_year = st.selectbox(
-                                    "Select Year",
-                                    available_years,
-                                    index=available_years.index(max(available_years)),
-                                    key="monthly_sea_level_year_selector"
-                                )
-                                filtered_df = sea_level_monthly_df[sea_level_monthly_df['Year'] == selected_year]
-                                fig_monthly_rise = px.bar(
-                                    filtered_df,
-                                    x='Month_Name',
-                                    y='Monthly_Change_mm',
-                                    labels={'Month_Name': 'Month', 'Monthly_Change_mm': 'Monthly Sea Level Change (mm)'},
-                                    title='',
-                                    height=340  # reduced height
-                                )
-                                fig_monthly_rise.update_traces(marker_color='rgba(31,119,180,0.8)', marker_line_color='#1f77b4', marker_line_width=2, text=filtered_df['Monthly_Change_mm'].round(2), textposition='outside')
-                                fig_monthly_rise.update_layout(
-                                    xaxis=dict(tickfont=dict(size=16)),
-                                    yaxis=dict(title=None, showgrid=True),
-                                    margin=dict(l=30, r=30, t=60, b=30),
-                                    showlegend=False
-                                )
-                                st.markdown(f"<div style='text-align:center; font-size:1.2rem; font-weight:bold; margin:0.5rem 0;'>Monthly Sea Level Rise Change ({selected_year})</div>", unsafe_allow_html=True)
-                                st.plotly_chart(fig_monthly_rise, config={"responsive": True}, key="monthly_sea_level_rise")
+                                monthly_sea_level_chart(load_sea_level_monthly())
                             except Exception as e:
                                 st.warning(f"Could not load monthly sea level data: {e}")
         # ...existing code...
@@ -799,18 +1081,11 @@ try:
     with st.expander("OpenAI Chat", expanded=True):
         col_chat, col_clear = st.columns([4,1])
         with col_chat:
-            user_input = st.text_input("Ask a question about the dashboard or data:", key="openai_user_input")
+            st.text_input("Ask a question about the dashboard or data:", key="openai_user_input", on_change=submit_openai_question)
         with col_clear:
             if st.button("Clear History", key="clear_openai_history"):
                 st.session_state['openai_chat_history'] = []
-                st.experimental_rerun()
-
-        if user_input:
-            # Placeholder for OpenAI API call
-            # In production, replace the below with an actual OpenAI API call
-            response = f"[OpenAI simulated response] You asked: '{user_input}'. (This is a placeholder. Integrate OpenAI API for real answers.)"
-            st.session_state['openai_chat_history'].append((user_input, response))
-            st.experimental_rerun()
+                st.rerun()
 
         if st.session_state['openai_chat_history']:
             for i, (q, a) in enumerate(st.session_state['openai_chat_history']):
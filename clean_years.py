@@ -1,24 +1,28 @@
-import json
-import pandas as pd
+import io
+import orjson
 import os
+from itertools import compress
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv as pacsv
 
 # Clean climate_data.json
 json_path = 'climate_data.json'
 if os.path.exists(json_path):
-    with open(json_path, 'r') as f:
-        data = json.load(f)
+    with open(json_path, 'rb') as f:
+        data = orjson.loads(f.read())
     clim = data['data']['data']
-    for country in list(clim.keys()):
-        if not isinstance(clim[country], dict):
+    for country, dates in list(clim.items()):
+        if not isinstance(dates, dict):
             continue
-        for date in list(clim[country].keys()):
-            year = int(date.split('-')[0])
-            if year < 2019 or year > 2023:
-                del clim[country][date]
-        if not clim[country]:
+        # Rebuild each country's dates in one pass instead of deleting keys one by one
+        kept = {date: value for date, value in dates.items() if 2019 <= int(date.split('-')[0]) <= 2023}
+        if kept:
+            clim[country] = kept
+        else:
             del clim[country]
-    with open(json_path, 'w') as f:
-        json.dump(data, f, indent=2)
+    with open(json_path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
     print(f'{json_path} cleaned to 2019-2023')
 
 # Clean CSV files
@@ -34,12 +38,24 @@ for file in csv_files:
     if not os.path.exists(file):
         print(f'{file} not found')
         continue
-    df = pd.read_csv(file)
-    year_cols = [col for col in df.columns if col.lower().startswith('year') or col.lower() == 'year']
-    if year_cols:
-        year_col = year_cols[0]
-        df = df[(df[year_col] >= 2019) & (df[year_col] <= 2023)]
-        df.to_csv(file, index=False)
+    with open(file, 'rb') as f:
+        raw = f.read()
+    # Arrow skips blank lines, so only non-blank lines line up with its rows
+    header, *rows = [line for line in raw.splitlines(keepends=True) if line.strip()]
+    year_col = next((col for col in pacsv.open_csv(io.BytesIO(raw)).schema.names if col.lower().startswith('year')), None)
+    if year_col:
+        # Arrow parses just the year column (empty cells become null and are
+        # dropped); kept rows are written back as their original lines, so no
+        # value is re-quoted or re-formatted
+        convert = pacsv.ConvertOptions(include_columns=[year_col], column_types={year_col: pa.float64()})
+        years = pacsv.read_csv(io.BytesIO(raw), convert_options=convert)[year_col]
+        if len(years) != len(rows):
+            print(f'{file}: rows span several lines, left unchanged')
+            continue
+        in_range = pc.fill_null(pc.and_(pc.greater_equal(years, 2019), pc.less_equal(years, 2023)), False)
+        with open(file, 'wb') as f:
+            f.write(header)
+            f.writelines(compress(rows, in_range.to_pylist()))
         print(f'{file} cleaned to 2019-2023')
     else:
         print(f'No year column found in {file}')
@@ -69,10 +69,16 @@ API Source: World Bank Climate Change Knowledge Portal
 
 import requests
 import json
+import orjson
 import os
 from datetime import datetime
 import hashlib
 
+# One session for all API calls, so the update check's HEAD and the following
+# GET reuse the same TCP/TLS connection
+HTTP_SESSION = requests.Session()
+REQUEST_TIMEOUT = 30  # seconds
+
 
 def fetch_climate_data(url):
     """
@@ -87,10 +93,11 @@ def fetch_climate_data(url):
     """
     try:
         print(f"Fetching data from: {url}")
-        response = requests.get(url)
+        response = HTTP_SESSION.get(url, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()  # Raise an exception for bad status codes
         
-        data = response.json()
+        # Parse the raw bytes with orjson, skipping the text decode and the slower stdlib json
+        data = orjson.loads(response.content)
         
         # Extract useful metadata from HTTP headers
         metadata = {
@@ -108,7 +115,7 @@ def fetch_climate_data(url):
         
         return data, metadata
     
-    except requests.exceptions.RequestException as e:
+    except (requests.exceptions.RequestException, orjson.JSONDecodeError) as e:
         print(f"✗ Error fetching data: {e}")
         return None, None
 
@@ -273,7 +280,7 @@ def check_for_updates(api_url, local_filename="climate_data.json"):
     # Make a HEAD request to check if data has changed (faster than full GET)
     try:
         print("\nChecking for updates...")
-        response = requests.head(api_url)
+        response = HTTP_SESSION.head(api_url, timeout=REQUEST_TIMEOUT)
         
         # Check Last-Modified header
         api_last_modified = response.headers.get('Last-Modified')
@@ -212,11 +212,12 @@ def fetch_regional_sea_level(region_name: str, url: str) -> Optional[pd.DataFram
             year_range = f"{df_clean['year'].min()}-{df_clean['year'].max()}"
             
             # Filter to 2019-2024
-            df_filtered = df_clean[(df_clean['year'] >= 2019) & (df_clean['year'] <= 2024)].copy()
+            in_range = (df_clean['year'] >= 2019) & (df_clean['year'] <= 2024)
+            df_filtered = df_clean.loc[in_range, ['year', 'Sea_Level_mm']]
             
             if len(df_filtered) > 0:
                 print(f"     [OK] {len(df_filtered)} records (2019-2024) from {year_range}")
-                return df_filtered[['year', 'Sea_Level_mm']]
+                return df_filtered
             else:
                 print(f"     [WARN]  No 2019-2024 data (available: {year_range}, {len(df_clean)} total records)")
                 return None
@@ -290,10 +291,7 @@ def aggregate_regional_data(regional_data: Dict[str, pd.DataFrame]) -> pd.DataFr
     all_data = []
     
     for region_name, df in regional_data.items():
-        df_copy = df.copy()
-        df_copy['Region'] = region_name
-        df_copy.rename(columns={'GMSL_noGIA': 'Sea_Level_mm'}, inplace=True)
-        all_data.append(df_copy)
+        all_data.append(df.rename(columns={'GMSL_noGIA': 'Sea_Level_mm'}).assign(Region=region_name))
     
     if all_data:
         combined = pd.concat(all_data, ignore_index=True)
@@ -341,8 +339,9 @@ def main():
     country_mapping.to_csv('country_ocean_mapping.csv', index=False)
     print(f"   [OK] country_ocean_mapping.csv ({len(country_mapping)} countries)")
     
-    # 3. Yearly summary by region
-    yearly_summary = combined_df.groupby(['Region', 'year']).agg({
+    # 3. Yearly summary by region; grouping on category codes rather than region strings
+    combined_df['Region'] = combined_df['Region'].astype('category')
+    yearly_summary = combined_df.groupby(['Region', 'year'], observed=True).agg({
         'Sea_Level_mm': 'mean'
     }).reset_index()
     yearly_summary.to_csv('sea_level_by_region_yearly.csv', index=False)
@@ -353,7 +352,7 @@ def main():
     print("- SUMMARY STATISTICS (2019-2024)")
     print("="*70)
     
-    summary = combined_df.groupby('Region').agg({
+    summary = combined_df.groupby('Region', observed=True).agg({
         'Sea_Level_mm': ['min', 'max', 'mean']
     }).round(2)
     summary.columns = ['Min (mm)', 'Max (mm)', 'Mean (mm)']